@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third-party apps
     'crispy_forms',
     'crispy_bootstrap5',
@@ -75,6 +76,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'videos.context_processors.popular_tags',
             ],
         },
     },
@@ -98,6 +100,19 @@ DATABASES = {
     }
 }
 
+# Cache configuration
+# 'default' is per process; 'shared' is visible to every web worker and to
+# management commands that precompute data for the request path
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'clipclap_cache',
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -134,13 +149,30 @@ AZURE_ACCOUNT_KEY = 'AFYDPBXtquagImz8dI+uvLiVXKBqQ6SBwIl0olTZbgYnTC9hLeHmNmpKfZZ
 AZURE_CONTAINER = 'videos'
 AZURE_SSL = True
 
-# Azure Storage Settings
-DEFAULT_FILE_STORAGE = 'storages.backends.azure_storage.AzureStorage'
+# Azure Storage Settings. Uploaded media (profile pictures included) goes
+# to the container; read URLs are memoized by core.storage.MediaStorage
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.MediaStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Optional CDN endpoint in front of the container, e.g. 'https://media.example.com'
+MEDIA_CDN_BASE_URL = None
+# Parallel block transfers for large blobs (core.storage)
+STORAGE_TRANSFER_CONCURRENCY = 8
+STORAGE_BLOCK_SIZE = 8 * 1024 * 1024  # 8MB
 AZURE_CONNECTION_STRING = f"DefaultEndpointsProtocol=https;AccountName={AZURE_ACCOUNT_NAME};AccountKey={AZURE_ACCOUNT_KEY};EndpointSuffix=core.windows.net"
 
-# File upload settings (increase for videos)
-DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
+# File upload settings. Videos arrive through chunked upload sessions
+# (videos.uploads), so no request needs to hold a whole file in memory;
+# larger form uploads spool to a temporary file instead
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB
+VIDEO_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB per chunk
+VIDEO_UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
+
+# Local disk cache of hot video blobs behind videos:stream (videos.blobcache)
+VIDEO_BLOB_CACHE_ENABLED = False
+VIDEO_BLOB_CACHE_MAX_BYTES = 10 * 1024 * 1024 * 1024  # 10GB
 
 # Custom user model
 AUTH_USER_MODEL = 'users.CustomUser'
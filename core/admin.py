@@ -1,3 +1,22 @@
 from django.contrib import admin
+from django.utils import timezone
+from .models import FeaturedPin, Job
 
-# Register your models here.
+@admin.register(FeaturedPin)
+class FeaturedPinAdmin(admin.ModelAdmin):
+    list_display = ('video', 'position', 'starts_at', 'ends_at')
+    list_filter = ('starts_at', 'ends_at')
+    search_fields = ('video__title',)
+    raw_id_fields = ('video',)
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'attempts', 'run_after', 'worker', 'wait_ms', 'run_ms', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('claim_token', 'worker', 'started_at', 'finished_at', 'wait_ms', 'run_ms', 'last_error', 'created_at')
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected jobs now')
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status='running').update(status='queued', attempts=0, run_after=timezone.now())
+        self.message_user(request, f'Requeued {updated} jobs.')
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import models, transaction
+
+# Rows removed (or detached) per statement by the background reapers. Each
+# batch commits on its own, so no lock is held for long and a reaper that
+# dies part way resumes where it stopped
+REAP_BATCH_SIZE = getattr(settings, 'REAP_BATCH_SIZE', 1000)
+
+
+def delete_in_batches(queryset, batch_size=REAP_BATCH_SIZE):
+    """Delete the rows of ``queryset`` a primary-key batch at a time; returns the number deleted."""
+    model = queryset.model
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            deleted += model._base_manager.filter(pk__in=pks).delete()[0]
+
+
+def detach_in_batches(queryset, field_name, batch_size=REAP_BATCH_SIZE):
+    """Set ``field_name`` to NULL on the rows of ``queryset`` a batch at a time."""
+    model = queryset.model
+    while True:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        model._base_manager.filter(pk__in=pks).update(**{field_name: None})
+
+
+def reap_related(instance, batch_size=REAP_BATCH_SIZE):
+    """
+    Remove everything that points at ``instance`` the way its on_delete
+    rules say (CASCADE rows deleted, SET_NULL rows detached, many-to-many
+    links dropped), in batches, so deleting ``instance`` afterwards has
+    nothing left to collect.
+    """
+    for relation in instance._meta.related_objects:
+        field = relation.field
+        if relation.many_to_many:
+            through = field.remote_field.through
+            delete_in_batches(through._base_manager.filter(**{field.m2m_reverse_field_name(): instance.pk}), batch_size)
+            continue
+        rows = relation.related_model._base_manager.filter(**{field.name: instance})
+        if relation.on_delete is models.CASCADE:
+            delete_in_batches(rows, batch_size)
+        elif relation.on_delete is models.SET_NULL:
+            detach_in_batches(rows, field.name, batch_size)
+    for field in instance._meta.many_to_many:
+        through = field.remote_field.through
+        delete_in_batches(through._base_manager.filter(**{field.m2m_field_name(): instance.pk}), batch_size)
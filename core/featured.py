@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.cache import caches
+from videos.models import Video
+from .models import FeaturedPin, VideoScore
+
+FEATURED_CACHE_ALIAS = 'shared'
+FEATURED_CACHE_KEY = 'core:featured_shelf'
+FEATURED_SHELF_SIZE = getattr(settings, 'FEATURED_SHELF_SIZE', 6)
+FEATURED_SHELF_TTL = getattr(settings, 'FEATURED_SHELF_TTL', 30 * 60)
+
+
+def build_featured_shelf(size=FEATURED_SHELF_SIZE):
+    """
+    Pick the shelf: active editorial pins first, then the public videos
+    with the highest engagement velocity (the decayed trending score),
+    at most one per creator. Returns the ordered list of video IDs.
+    """
+    shelf = []
+    creators = set()
+
+    pins = (
+        FeaturedPin.objects.active()
+        .filter(video__visibility='public')
+        .values_list('video_id', 'video__user_id')
+    )
+    for video_id, creator_id in pins:
+        if video_id not in shelf:
+            shelf.append(video_id)
+            creators.add(creator_id)
+
+    # Over-fetch so skipping repeat creators still fills the shelf
+    candidates = (
+        VideoScore.objects.filter(video__visibility='public', trending__gt=0)
+        .order_by('-trending', '-video_id')
+        .values_list('video_id', 'video__user_id')[:size * 5]
+    )
+    for video_id, creator_id in candidates:
+        if len(shelf) >= size:
+            break
+        if video_id not in shelf and creator_id not in creators:
+            shelf.append(video_id)
+            creators.add(creator_id)
+
+    return shelf[:size]
+
+
+def publish_featured_shelf(size=FEATURED_SHELF_SIZE, ttl=FEATURED_SHELF_TTL):
+    """Build the shelf and store its IDs in the shared cache."""
+    shelf = build_featured_shelf(size)
+    caches[FEATURED_CACHE_ALIAS].set(FEATURED_CACHE_KEY, [str(video_id) for video_id in shelf], ttl)
+    return shelf
+
+
+def featured_videos():
+    """
+    The materialized shelf for the home page: a cache read plus one
+    primary-key IN query. An expired shelf simply renders nothing.
+    """
+    shelf = caches[FEATURED_CACHE_ALIAS].get(FEATURED_CACHE_KEY)
+    if not shelf:
+        return []
+    videos = Video.objects.filter(visibility='public').with_card_data().in_bulk(shelf)
+    return [videos[video_id] for video_id in map(Video._meta.pk.to_python, shelf) if video_id in videos]
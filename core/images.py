@@ -0,0 +1,108 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Rendition widths per image field. Grid cards and the 120px watch sidebar
+# need at most ~2x their CSS width; avatars are drawn at 32-150px
+THUMBNAIL_WIDTHS = getattr(settings, 'THUMBNAIL_RENDITION_WIDTHS', [240, 480, 960])
+AVATAR_WIDTHS = getattr(settings, 'AVATAR_RENDITION_WIDTHS', [64, 128, 320])
+
+# format -> (Pillow format, file extension, save options)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def renditions_of(fieldfile):
+    """
+    The stored renditions of an image field, read from the model's
+    ``<field>_renditions`` JSON, or None while they are missing or were
+    made from a previous upload.
+    """
+    if not fieldfile:
+        return None
+    renditions = getattr(fieldfile.instance, f'{fieldfile.field.name}_renditions', None) or {}
+    if renditions.get('source') != fieldfile.name:
+        return None
+    return renditions
+
+
+def needs_renditions(instance, field_name):
+    fieldfile = getattr(instance, field_name)
+    return bool(fieldfile) and renditions_of(fieldfile) is None
+
+
+def make_renditions(instance, field_name, widths):
+    """
+    Resize ``instance.<field_name>`` to each of ``widths`` (never upscaling)
+    in every format of RENDITION_FORMATS, store the files beside the
+    original and record them in ``<field_name>_renditions``. Files of
+    earlier renditions are deleted once the new ones are recorded.
+    """
+    fieldfile = getattr(instance, field_name)
+    storage = fieldfile.storage
+    with storage.open(fieldfile.name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    # Phone photos are stored sideways with an orientation tag
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    # Widths past the original collapse into one full-size, recompressed copy
+    sizes = sorted({min(width, image.width) for width in widths})
+
+    root = os.path.splitext(fieldfile.name)[0]
+    variants = {fmt: [] for fmt in RENDITION_FORMATS}
+    for width in sizes:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt, (pil_format, extension, options) in RENDITION_FORMATS.items():
+            frame = resized
+            if pil_format == 'JPEG' and has_alpha:
+                frame = Image.new('RGB', resized.size, 'white')
+                frame.paste(resized, mask=resized.getchannel('A'))
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, **options)
+            name = storage.save(f'{root}_{width}w.{extension}', ContentFile(buffer.getvalue()))
+            variants[fmt].append([width, name])
+
+    previous = getattr(instance, f'{field_name}_renditions') or {}
+    renditions = {'source': fieldfile.name, 'width': image.width, 'height': image.height, **variants}
+    type(instance).objects.filter(pk=instance.pk).update(**{f'{field_name}_renditions': renditions})
+    setattr(instance, f'{field_name}_renditions', renditions)
+    current = {name for fmt in RENDITION_FORMATS for _, name in variants[fmt]}
+    for fmt in RENDITION_FORMATS:
+        for _, name in previous.get(fmt, []):
+            # Storages that overwrite may have reused a name
+            if name not in current:
+                storage.delete(name)
+    return renditions
+
+
+def srcset(fieldfile, fmt):
+    """A ``srcset`` attribute value over the ``fmt`` renditions, or '' if there are none."""
+    renditions = renditions_of(fieldfile)
+    if renditions is None:
+        return ''
+    variants = renditions.get(fmt, [])
+    storage = fieldfile.storage
+    if hasattr(storage, 'urls'):
+        urls = storage.urls([name for _, name in variants])
+    else:
+        urls = {name: storage.url(name) for _, name in variants}
+    return ', '.join(f'{urls[name]} {width}w' for width, name in variants)
+
+
+def rendition_url(fieldfile, width, fmt='jpeg'):
+    """URL of the smallest rendition at least ``width`` wide, else the largest, else the original."""
+    renditions = renditions_of(fieldfile)
+    if renditions is None or not renditions.get(fmt):
+        return fieldfile.url if fieldfile else ''
+    variants = renditions[fmt]
+    name = next((name for w, name in variants if w >= width), variants[-1][1])
+    return fieldfile.storage.url(name)
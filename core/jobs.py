@@ -0,0 +1,184 @@
+import logging
+import statistics
+import traceback
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Default visibility timeout: a claimed job that is neither finished nor
+# failed by then is assumed lost with its worker and handed out again
+JOB_TIMEOUT = getattr(settings, 'JOB_TIMEOUT_SECONDS', 15 * 60)
+JOB_MAX_ATTEMPTS = getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+JOB_RETRY_DELAY = getattr(settings, 'JOB_RETRY_DELAY_SECONDS', 30)
+JOB_RETENTION = timedelta(days=getattr(settings, 'JOB_RETENTION_DAYS', 7))
+
+
+@dataclass(frozen=True)
+class JobType:
+    handler: object
+    timeout: int
+    max_attempts: int
+
+
+_registry = {}
+
+
+def register(kind, timeout=JOB_TIMEOUT, max_attempts=JOB_MAX_ATTEMPTS):
+    """
+    Decorator registering ``handler(payload)`` for jobs of ``kind``. Handlers
+    live in each app's jobs.py, which the worker imports at startup.
+    """
+    def decorator(handler):
+        _registry[kind] = JobType(handler, timeout, max_attempts)
+        return handler
+    return decorator
+
+
+def enqueue(kind, payload=None, delay=0):
+    """
+    Queue a job. Called inside a transaction, the job becomes visible to
+    workers only if that transaction commits.
+    """
+    job_type = _registry.get(kind)
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        max_attempts=job_type.max_attempts if job_type else JOB_MAX_ATTEMPTS,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_many(kind, payloads, batch_size=1000):
+    """Queue one job per payload with batched INSERTs; returns the number queued."""
+    job_type = _registry.get(kind)
+    now = timezone.now()
+    jobs = Job.objects.bulk_create(
+        (
+            Job(kind=kind, payload=payload, max_attempts=job_type.max_attempts if job_type else JOB_MAX_ATTEMPTS, run_after=now)
+            for payload in payloads
+        ),
+        batch_size=batch_size,
+    )
+    return len(jobs)
+
+
+def claim(worker, limit, kinds=None):
+    """
+    Lock up to ``limit`` due jobs for ``worker``: queued jobs whose time has
+    come, plus running jobs whose visibility timeout expired. SKIP LOCKED
+    lets any number of workers poll the table without blocking each other.
+    """
+    now = timezone.now()
+    due = Q(status='queued', run_after__lte=now) | Q(status='running', locked_until__lt=now)
+    with transaction.atomic():
+        jobs = Job.objects.select_for_update(skip_locked=True).filter(due)
+        jobs = list(jobs.filter(kind__in=kinds if kinds is not None else list(_registry)).order_by('run_after', 'pk')[:limit])
+        # A job whose worker died on its final attempt is not handed out again
+        abandoned = [job for job in jobs if job.status == 'running' and job.attempts >= job.max_attempts]
+        if abandoned:
+            Job.objects.filter(pk__in=[job.pk for job in abandoned]).update(
+                status='failed', locked_until=None, last_error='Visibility timeout expired on the final attempt',
+            )
+            jobs = [job for job in jobs if job not in abandoned]
+        for job in jobs:
+            timeout = _registry[job.kind].timeout if job.kind in _registry else JOB_TIMEOUT
+            job.status = 'running'
+            job.attempts += 1
+            job.worker = worker
+            job.claim_token = uuid.uuid4()
+            job.started_at = now
+            job.locked_until = now + timedelta(seconds=timeout)
+            job.wait_ms = (now - job.run_after).total_seconds() * 1000
+        Job.objects.bulk_update(jobs, ['status', 'attempts', 'worker', 'claim_token', 'started_at', 'locked_until', 'wait_ms'])
+    return jobs
+
+
+def run(job):
+    """
+    Execute a claimed job and record the outcome. Failures are retried with
+    exponential backoff until the job runs out of attempts. The claim token
+    guards the write, so a worker whose claim expired cannot clobber the
+    result of the worker that took the job over.
+    """
+    job_type = _registry.get(job.kind)
+    start = timezone.now()
+    try:
+        if job_type is None:
+            raise LookupError(f'No handler registered for job kind {job.kind!r}')
+        job_type.handler(job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s #%s failed (attempt %s/%s)', job.kind, job.pk, job.attempts, job.max_attempts)
+        finished = timezone.now()
+        retry = job.attempts < job.max_attempts
+        Job.objects.filter(pk=job.pk, claim_token=job.claim_token).update(
+            status='queued' if retry else 'failed',
+            run_after=finished + timedelta(seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1)) if retry else F('run_after'),
+            locked_until=None,
+            last_error=error,
+            finished_at=finished,
+            run_ms=(finished - start).total_seconds() * 1000,
+        )
+        return False
+
+    finished = timezone.now()
+    Job.objects.filter(pk=job.pk, claim_token=job.claim_token).update(
+        status='done',
+        locked_until=None,
+        finished_at=finished,
+        run_ms=(finished - start).total_seconds() * 1000,
+    )
+    return True
+
+
+def run_by_id(job_id, claim_token):
+    """Entry point for pool processes, which receive only picklable identifiers."""
+    job = Job.objects.filter(pk=job_id, claim_token=claim_token, status='running').first()
+    if job is None:
+        return False
+    return run(job)
+
+
+def prune(older_than=JOB_RETENTION):
+    """Delete finished jobs past the retention window; failed ones are kept for inspection."""
+    return Job.objects.filter(status='done', finished_at__lt=timezone.now() - older_than).delete()[0]
+
+
+def stats(since=timedelta(hours=1)):
+    """Queue depth per status and run/wait latency per kind over the recent window."""
+    depth = {}
+    for kind, status in Job.objects.filter(status__in=['queued', 'running']).values_list('kind', 'status'):
+        depth.setdefault(kind, {'queued': 0, 'running': 0})[status] += 1
+
+    timings = {}
+    recent = Job.objects.filter(finished_at__gte=timezone.now() - since).values_list('kind', 'status', 'run_ms', 'wait_ms')
+    for kind, status, run_ms, wait_ms in recent:
+        entry = timings.setdefault(kind, {'done': 0, 'failed': 0, 'run_ms': [], 'wait_ms': []})
+        entry['done' if status == 'done' else 'failed'] += 1
+        entry['run_ms'].append(run_ms or 0)
+        entry['wait_ms'].append(wait_ms or 0)
+
+    def summary(values):
+        if not values:
+            return None
+        values = sorted(values)
+        return {'p50': statistics.median(values), 'p95': values[int(len(values) * 0.95)], 'max': values[-1]}
+
+    return {
+        kind: {
+            **depth.get(kind, {'queued': 0, 'running': 0}),
+            'done': timings.get(kind, {}).get('done', 0),
+            'failed': timings.get(kind, {}).get('failed', 0),
+            'run_ms': summary(timings.get(kind, {}).get('run_ms', [])),
+            'wait_ms': summary(timings.get(kind, {}).get('wait_ms', [])),
+        }
+        for kind in sorted(set(depth) | set(timings))
+    }
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from storages.backends.azure_storage import AzureStorage
+from core.storage import MediaStorage, url_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Times URL construction for a page of video cards: plain AzureStorage.url per file '
+        'against MediaStorage bulk signing (cold) and its memoized lookups (warm). Runs offline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=50, help='Cards per page')
+        parser.add_argument('--files-per-card', type=int, default=8, help='Thumbnail and avatar renditions per card')
+        parser.add_argument('--expire', type=int, default=3600, help='SAS lifetime in seconds; 0 for unsigned URLs')
+        parser.add_argument('--pages', type=int, default=20)
+
+    def handle(self, *args, **options):
+        expire = options['expire'] or None
+        plain = AzureStorage(expiration_secs=expire)
+        media = MediaStorage(expiration_secs=expire)
+        pages = [
+            [f'thumbnails/bench/{page}/{card}_{i}.webp' for card in range(options['cards']) for i in range(options['files_per_card'])]
+            for page in range(options['pages'])
+        ]
+
+        def timed(render):
+            start = time.perf_counter()
+            for names in pages:
+                render(names)
+            return (time.perf_counter() - start) * 1000 / len(pages)
+
+        url_cache.clear()
+        results = [
+            ('per-file url()', timed(lambda names: [plain.url(name) for name in names])),
+            ('bulk, cold', timed(media.urls)),
+            ('memoized url()', timed(lambda names: [media.url(name) for name in names])),
+        ]
+        self.stdout.write(f'{len(pages[0])} URLs per page, {"signed" if expire else "unsigned"}:')
+        for mode, ms in results:
+            self.stdout.write(f'  {mode:<16}{ms:>9.2f}ms per page')
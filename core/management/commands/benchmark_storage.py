@@ -0,0 +1,79 @@
+import os
+import tempfile
+import time
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand, CommandError
+from core.storage import STORAGE_TRANSFER_CONCURRENCY, MediaStorage, download_to
+
+# Azurite's well-known development account
+AZURITE_CONNECTION_STRING = (
+    'DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;'
+    'AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;'
+    'BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures upload and download throughput of one large blob with sequential and parallel '
+        'block transfers, against Azurite (or any --connection-string) or a local filesystem stand-in.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=['azurite', 'filesystem'], default='azurite')
+        parser.add_argument('--connection-string', default=AZURITE_CONNECTION_STRING)
+        parser.add_argument('--container', default='benchmark')
+        parser.add_argument('--size-mb', type=int, default=256, help='Size of the test blob')
+        parser.add_argument('--concurrency', type=int, action='append', help='Transfer concurrency to try (repeatable)')
+
+    def handle(self, *args, **options):
+        levels = options['concurrency'] or sorted({1, STORAGE_TRANSFER_CONCURRENCY})
+        size = options['size_mb'] * 1024 * 1024
+        with tempfile.TemporaryDirectory() as scratch:
+            source = os.path.join(scratch, 'source.bin')
+            with open(source, 'wb') as handle:
+                for _ in range(options['size_mb']):
+                    handle.write(os.urandom(1024 * 1024))
+
+            if options['backend'] == 'filesystem':
+                # Baseline for the copy path itself; concurrency does not apply
+                storages = [('filesystem', FileSystemStorage(location=os.path.join(scratch, 'storage')), 1)]
+            else:
+                storages = [
+                    (f'concurrency {level}', self.azure_storage(options, level), level)
+                    for level in levels
+                ]
+
+            self.stdout.write(f'{options["size_mb"]}MB blob, {options["backend"]}:')
+            for label, storage, level in storages:
+                name = f'benchmark/{label.replace(" ", "_")}.bin'
+                start = time.perf_counter()
+                with open(source, 'rb') as handle:
+                    name = storage.save(name, File(handle))
+                upload = time.perf_counter() - start
+
+                start = time.perf_counter()
+                with open(os.path.join(scratch, 'copy.bin'), 'wb') as handle:
+                    download_to(storage, name, handle, concurrency=level)
+                download = time.perf_counter() - start
+                storage.delete(name)
+
+                self.stdout.write(
+                    f'  {label:<16} upload {size / upload / 1024 ** 2:>8.1f}MB/s   download {size / download / 1024 ** 2:>8.1f}MB/s'
+                )
+
+    def azure_storage(self, options, concurrency):
+        storage = MediaStorage(
+            connection_string=options['connection_string'],
+            azure_container=options['container'],
+            upload_max_conn=concurrency,
+            location='',
+        )
+        try:
+            if not storage.client.exists():
+                storage.client.create_container()
+        except Exception as e:
+            raise CommandError(f'Cannot reach blob storage ({e}); start Azurite or pass --backend filesystem.') from e
+        return storage
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from core.featured import FEATURED_SHELF_SIZE, FEATURED_SHELF_TTL, publish_featured_shelf
+
+
+class Command(BaseCommand):
+    help = 'Materializes the home page featured shelf into the shared cache; run it on a schedule shorter than --ttl'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=FEATURED_SHELF_SIZE, help='Number of videos on the shelf')
+        parser.add_argument('--ttl', type=int, default=FEATURED_SHELF_TTL, help='Seconds before the cached shelf expires')
+
+    def handle(self, *args, **options):
+        shelf = publish_featured_shelf(size=options['size'], ttl=options['ttl'])
+        self.stdout.write(self.style.SUCCESS(f'Published a featured shelf of {len(shelf)} videos.'))
@@ -1,3 +1,4 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from videos.models import Video, Tag
@@ -117,4 +118,7 @@ class Command(BaseCommand):
                             parent=comment
                         )
         
+        # Sample rows bypass the view write paths, so sync the stored counters
+        call_command('rebuild_video_counts', stdout=self.stdout)
+        
         self.stdout.write(self.style.SUCCESS('Successfully created sample data!'))
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import autodiscover_modules
+from core.jobs import stats
+
+
+class Command(BaseCommand):
+    help = 'Prints queue depth and recent run/wait latency per job kind'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=60, help='Window for the latency figures')
+
+    def handle(self, *args, **options):
+        autodiscover_modules('jobs')
+        self.stdout.write(f'{"kind":<28}{"queued":>8}{"running":>8}{"done":>7}{"failed":>7}{"run p50":>11}{"run p95":>11}{"wait p50":>11}')
+        for kind, row in stats(timedelta(minutes=options['minutes'])).items():
+            run, waited = row['run_ms'] or {}, row['wait_ms'] or {}
+            self.stdout.write(
+                f'{kind:<28}{row["queued"]:>8}{row["running"]:>8}{row["done"]:>7}{row["failed"]:>7}'
+                f'{run.get("p50", 0):>9.0f}ms{run.get("p95", 0):>9.0f}ms{waited.get("p50", 0):>9.0f}ms'
+            )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from core.images import needs_renditions
+from core.jobs import enqueue_many
+from users.jobs import AVATAR_RENDITIONS
+from users.models import CustomUser
+from videos.jobs import THUMBNAIL_RENDITIONS
+from videos.models import Video
+
+
+class Command(BaseCommand):
+    help = 'Queues srcset renditions for thumbnails and profile pictures that lack them'
+
+    def handle(self, *args, **options):
+        videos = Video.objects.exclude(thumbnail='').exclude(thumbnail__isnull=True).only('pk', 'thumbnail', 'thumbnail_renditions')
+        queued = enqueue_many(THUMBNAIL_RENDITIONS, (
+            {'video_id': str(video.pk)} for video in videos.iterator() if needs_renditions(video, 'thumbnail')
+        ))
+        self.stdout.write(f'Queued {queued} video thumbnails.')
+
+        users = CustomUser.objects.exclude(profile_pic='').exclude(profile_pic__isnull=True).only('pk', 'profile_pic', 'profile_pic_renditions')
+        queued = enqueue_many(AVATAR_RENDITIONS, (
+            {'user_id': user.pk} for user in users.iterator() if needs_renditions(user, 'profile_pic')
+        ))
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} profile pictures.'))
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.scoring import refresh_scores
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the Popular/Trending feed scores; schedule it every few minutes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Score rows upserted per INSERT')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        scored = refresh_scores(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Scored {scored} videos in {elapsed:.1f}s.'))
@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils.module_loading import autodiscover_modules
+
+# Spawned pool processes import this module before Django is set up, so
+# nothing that touches models may be imported at module level
+
+
+def _init_process():
+    import django
+
+    # Ctrl-C reaches the whole process group; only the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+    autodiscover_modules('jobs')
+
+
+def _execute(job_id, claim_token):
+    from core import jobs
+
+    close_old_connections()
+    return jobs.run_by_id(job_id, claim_token)
+
+
+class Command(BaseCommand):
+    help = 'Runs background jobs from the database queue on a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 2, help='Jobs run in parallel')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--kind', action='append', dest='kinds', help='Only run jobs of this kind (repeatable)')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+
+    def handle(self, *args, **options):
+        from core import jobs
+
+        autodiscover_modules('jobs')
+        processes = options['processes']
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+            self.stdout.write('Finishing running jobs before exit...')
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        # Spawned children set Django up from scratch instead of inheriting
+        # this process's database connections
+        connections.close_all()
+        pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process,
+        )
+        running = {}
+        last_prune = 0
+        self.stdout.write(f'Worker {worker} running {processes} processes.')
+        try:
+            while not stopping:
+                free = processes - len(running)
+                claimed = jobs.claim(worker, free, options['kinds']) if free else []
+                for job in claimed:
+                    running[pool.submit(_execute, job.pk, job.claim_token)] = job
+                if options['once'] and not running and not claimed:
+                    break
+
+                if time.monotonic() - last_prune > 3600:
+                    jobs.prune()
+                    last_prune = time.monotonic()
+
+                if running:
+                    done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = running.pop(future)
+                        error = future.exception()
+                        if error is not None:
+                            # The pool process itself died; the visibility timeout will hand the job out again
+                            self.stderr.write(f'{job.kind} #{job.pk}: worker process error: {error!r}')
+                        else:
+                            self.stdout.write(f'{job.kind} #{job.pk}: {"done" if future.result() else "failed"}')
+                else:
+                    time.sleep(options['poll_interval'])
+        finally:
+            # Let in-flight jobs finish; anything killed mid-run is retried
+            # after its visibility timeout
+            pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS('Worker stopped.'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('videos', '0005_video_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoScore',
+            fields=[
+                ('video', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='videos.video')),
+                ('popular', models.FloatField(default=0)),
+                ('trending', models.FloatField(default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-popular', '-video'], name='videoscore_popular_idx'), models.Index(fields=['-trending', '-video'], name='videoscore_trending_idx')],
+            },
+        ),
+    ]
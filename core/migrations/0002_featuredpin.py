@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.core.management import call_command
+from django.db import migrations, models
+
+
+def create_cache_table(apps, schema_editor):
+    # The shared cache that holds the featured shelf is database-backed
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('videos', '0005_video_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeaturedPin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='Lower positions are shown first')),
+                ('starts_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='featured_pins', to='videos.video')),
+            ],
+            options={
+                'ordering': ['position', '-starts_at'],
+            },
+        ),
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,85 @@
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from videos.models import Video
 
-# Create your models here.
+class VideoScore(models.Model):
+    """
+    Precomputed ranking scores for the home feed sort modes, refreshed in
+    bulk by the refresh_video_scores command so the feed is an index scan.
+    """
+    video = models.OneToOneField(Video, on_delete=models.CASCADE, primary_key=True, related_name='score')
+    popular = models.FloatField(default=0)
+    trending = models.FloatField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-popular', '-video'], name='videoscore_popular_idx'),
+            models.Index(fields=['-trending', '-video'], name='videoscore_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f'Scores for {self.video_id}'
+
+
+class FeaturedPinQuerySet(models.QuerySet):
+    def active(self, now=None):
+        now = now or timezone.now()
+        return self.filter(starts_at__lte=now).filter(Q(ends_at__isnull=True) | Q(ends_at__gt=now))
+
+class FeaturedPin(models.Model):
+    """An editorial pick pinned to the featured shelf for a time window."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='featured_pins')
+    position = models.PositiveSmallIntegerField(default=0, help_text='Lower positions are shown first')
+    starts_at = models.DateTimeField(default=timezone.now)
+    ends_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = FeaturedPinQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['position', '-starts_at']
+
+    def __str__(self):
+        return f'{self.video.title} pinned at {self.position}'
+
+
+class Job(models.Model):
+    """
+    A unit of background work for the run_worker command (see core.jobs).
+    Workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED; a claim
+    lasts until ``locked_until``, after which another worker may retry it.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+    worker = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Timing of the latest attempt: time spent waiting to be claimed and running
+    wait_ms = models.FloatField(null=True, blank=True)
+    run_ms = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_claim_idx'),
+            models.Index(fields=['kind', '-finished_at'], name='job_kind_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk} ({self.status})'
@@ -0,0 +1,153 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        # Keep full microsecond precision; truncating would skip or repeat rows
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps({'d': direction, 'v': [_encode_value(v) for v in values]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, values) for a cursor token, or None if it is not valid."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, values = payload['d'], payload['v']
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        return None
+    if direction not in ('n', 'p') or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset, with opaque neighbour cursors."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a unique ordering such as ('-created_at', '-pk').
+
+    Unlike Paginator there is no COUNT(*) and no OFFSET: each page is a range
+    scan that starts right after the last row of the previous page, so deep
+    pages cost the same as the first one. The last ordering field must be
+    unique to break ties.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-pk')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.descending = [field.startswith('-') for field in self.ordering]
+
+    def get_page(self, cursor=None):
+        """Return the page for ``cursor``; a missing or invalid cursor yields the first page."""
+        sought = self.seek(cursor)
+        if sought is None:
+            return self._forward(self.queryset, first_page=True)
+
+        direction, beyond = sought
+        if direction == 'n':
+            return self._forward(beyond)
+        return self._backward(beyond)
+
+    def seek(self, cursor):
+        """
+        ``(direction, rows beyond the cursor)`` for a usable cursor, or None
+        for a missing, malformed or tampered one.
+        """
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None or len(decoded[1]) != len(self.fields):
+            return None
+        direction, values = decoded
+        try:
+            return direction, self.queryset.filter(self._beyond(values, forward=direction == 'n'))
+        except (ValidationError, ValueError, TypeError):
+            # Well-formed, but holding values the ordering fields cannot take
+            return None
+
+    def _forward(self, queryset, first_page=False):
+        rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor('n', rows[-1]) if has_more else None,
+            previous_cursor=self._cursor('p', rows[0]) if rows and not first_page else None,
+        )
+
+    def _backward(self, queryset):
+        reversed_ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+        rows = list(queryset.order_by(*reversed_ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor('n', rows[-1]) if rows else None,
+            previous_cursor=self._cursor('p', rows[0]) if has_more else None,
+        )
+
+    def _beyond(self, values, forward):
+        """
+        Rows strictly after (or before) the cursor row in the page ordering,
+        written as f1 <= v1 AND (f1 < v1 OR (f1 = v1 AND ...)) so the leading
+        column bounds an index range scan.
+        """
+        def build(position):
+            field, value = self.fields[position], values[position]
+            later = 'lt' if self.descending[position] == forward else 'gt'
+            strict = Q(**{f'{field}__{later}': value})
+            if position == len(self.fields) - 1:
+                return strict
+            return Q(**{f'{field}__{later}e': value}) & (strict | (Q(**{field: value}) & build(position + 1)))
+
+        return build(0)
+
+    def _cursor(self, direction, obj):
+        return encode_cursor(direction, [self._value(obj, field) for field in self.fields])
+
+    @staticmethod
+    def _value(obj, field):
+        for attr in field.split('__'):
+            obj = getattr(obj, attr)
+        return obj
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from interactions.models import Like, VideoViewRollup
+from interactions.rollups import pending_views
+from videos.models import Video
+from .models import VideoScore
+
+# Half-lives (in hours) of the exponential decay applied to engagement
+POPULAR_HALF_LIFE = getattr(settings, 'FEED_POPULAR_HALF_LIFE_HOURS', 24 * 30)
+TRENDING_HALF_LIFE = getattr(settings, 'FEED_TRENDING_HALF_LIFE_HOURS', 24)
+
+# Only engagement inside these windows contributes; older activity has decayed away
+POPULAR_WINDOW = timedelta(days=getattr(settings, 'FEED_POPULAR_WINDOW_DAYS', 180))
+TRENDING_WINDOW = timedelta(days=getattr(settings, 'FEED_TRENDING_WINDOW_DAYS', 7))
+
+# A like is a stronger signal than a view
+LIKE_WEIGHT = getattr(settings, 'FEED_LIKE_WEIGHT', 4.0)
+
+
+def _hourly_counts(queryset, since):
+    """(video_id, hour bucket, events) rows aggregated in the database."""
+    return (
+        queryset.filter(created_at__gte=since)
+        .annotate(hour=TruncHour('created_at'))
+        .values_list('video_id', 'hour')
+        .annotate(events=Count('pk'))
+        .order_by()
+    )
+
+
+def _hourly_views(since):
+    """Hourly view counts: the rollup table plus raw rows it has not absorbed yet."""
+    rolled_up = VideoViewRollup.objects.filter(hour__gte=since).values_list('video_id', 'hour', 'views')
+    return chain(rolled_up, _hourly_counts(pending_views(), since))
+
+
+def _decayed_totals(rows, index, now, half_life):
+    """
+    Sum events per video, each hourly bucket weighted by 0.5 ** (age / half_life).
+    Returns an array aligned with ``index``.
+    """
+    totals = np.zeros(len(index))
+    rows = [(index[video_id], hour, events) for video_id, hour, events in rows if video_id in index]
+    if not rows:
+        return totals
+    positions, hours, events = zip(*rows)
+    ages = np.array([(now - hour).total_seconds() / 3600 for hour in hours])
+    weights = np.exp2(-ages / half_life) * np.array(events, dtype=float)
+    np.add.at(totals, np.array(positions), weights)
+    return totals
+
+
+def compute_scores(now=None):
+    """
+    Score every public video from time-decayed views and likes.
+    Returns (video_ids, popular, trending) with the scores as NumPy arrays.
+    """
+    now = now or timezone.now()
+    video_ids = list(Video.objects.filter(visibility='public').values_list('pk', flat=True))
+    index = {video_id: position for position, video_id in enumerate(video_ids)}
+
+    likes = Like.objects.filter(is_like=True)
+    popular = (
+        _decayed_totals(_hourly_views(now - POPULAR_WINDOW), index, now, POPULAR_HALF_LIFE)
+        + LIKE_WEIGHT * _decayed_totals(_hourly_counts(likes, now - POPULAR_WINDOW), index, now, POPULAR_HALF_LIFE)
+    )
+    trending = (
+        _decayed_totals(_hourly_views(now - TRENDING_WINDOW), index, now, TRENDING_HALF_LIFE)
+        + LIKE_WEIGHT * _decayed_totals(_hourly_counts(likes, now - TRENDING_WINDOW), index, now, TRENDING_HALF_LIFE)
+    )
+    return video_ids, popular, trending
+
+
+def refresh_scores(batch_size=5000, now=None):
+    """Recompute and upsert VideoScore rows; returns the number written."""
+    now = now or timezone.now()
+    video_ids, popular, trending = compute_scores(now)
+    VideoScore.objects.bulk_create(
+        (
+            VideoScore(video_id=video_id, popular=float(p), trending=float(t), computed_at=now)
+            for video_id, p, t in zip(video_ids, popular, trending)
+        ),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['video'],
+        update_fields=['popular', 'trending', 'computed_at'],
+    )
+    # Videos that went private or were removed from the feed since the last run
+    VideoScore.objects.filter(computed_at__lt=now).delete()
+    return len(video_ids)
@@ -0,0 +1,270 @@
+import functools
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from tempfile import SpooledTemporaryFile
+from urllib.parse import quote, urlparse, urlunparse
+
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobSasPermissions, BlobServiceClient, generate_blob_sas
+from django.conf import settings
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+from requests.adapters import HTTPAdapter
+from storages.backends.azure_storage import AzureStorage, AzureStorageFile
+
+# Serve media from a CDN endpoint in front of the container, e.g.
+# 'https://media.clipclap.example'; blob paths (and SAS tokens, when URLs
+# are signed) are appended to it unchanged
+MEDIA_CDN_BASE_URL = getattr(settings, 'MEDIA_CDN_BASE_URL', None)
+STORAGE_URL_CACHE_SIZE = getattr(settings, 'STORAGE_URL_CACHE_SIZE', 50_000)
+# Unsigned URLs never change; they expire only so configuration changes
+# (a new CDN, say) reach long-running workers
+STORAGE_URL_CACHE_TTL = getattr(settings, 'STORAGE_URL_CACHE_TTL', 24 * 60 * 60)
+
+# Every storage instance in a process shares one HTTP connection pool per
+# account. Blobs above one block move as STORAGE_BLOCK_SIZE blocks or
+# ranges, STORAGE_TRANSFER_CONCURRENCY of them in flight at once
+STORAGE_POOL_SIZE = getattr(settings, 'STORAGE_POOL_SIZE', 32)
+STORAGE_TRANSFER_CONCURRENCY = getattr(settings, 'STORAGE_TRANSFER_CONCURRENCY', 8)
+STORAGE_BLOCK_SIZE = getattr(settings, 'STORAGE_BLOCK_SIZE', 8 * 1024 * 1024)
+
+
+class URLCache:
+    """
+    Process-local LRU of resolved file URLs with a per-entry deadline. A
+    lookup is a dict access, so templates can call .url freely once a page
+    has been warmed.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, mapping, ttl):
+        deadline = time.monotonic() + ttl
+        with self._lock:
+            for key, url in mapping.items():
+                self._entries[key] = (url, deadline)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+url_cache = URLCache(STORAGE_URL_CACHE_SIZE)
+
+_service_clients = {}
+_service_clients_lock = threading.Lock()
+
+
+def _pooled_transport():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=STORAGE_POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return RequestsTransport(session=session, session_owner=False)
+
+
+class MediaStorageFile(AzureStorageFile):
+    """AzureStorageFile that downloads large blobs as parallel ranged reads."""
+
+    def _get_file(self):
+        if self._file is None and ('r' in self._mode or 'a' in self._mode):
+            file = SpooledTemporaryFile(
+                max_size=self._storage.max_memory_size,
+                suffix='.AzureStorageFile',
+                dir=settings.FILE_UPLOAD_TEMP_DIR,
+            )
+            self._storage.client.download_blob(
+                self._path, max_concurrency=STORAGE_TRANSFER_CONCURRENCY, timeout=self._storage.timeout,
+            ).readinto(file)
+            if 'r' in self._mode:
+                file.seek(0)
+            self._file = file
+        return super()._get_file()
+
+    file = property(_get_file, AzureStorageFile._set_file)
+
+
+@deconstructible
+class MediaStorage(AzureStorage):
+    """
+    AzureStorage whose read URLs are memoized and can be built in bulk.
+    Signed (SAS) URLs are cached for half their lifetime, so any URL handed
+    to a page stays valid for at least half of AZURE_URL_EXPIRATION_SECS.
+
+    All instances in a process share one service client, and so one pooled
+    HTTP transport, per account; blobs are transferred in parallel blocks.
+    """
+
+    def __init__(self, **settings):
+        super().__init__(**settings)
+        self._client_pid = None
+
+    def get_default_settings(self):
+        return {**super().get_default_settings(), 'upload_max_conn': STORAGE_TRANSFER_CONCURRENCY}
+
+    @property
+    def service_client(self):
+        # Looked up per call: a forked worker must not reuse its parent's sockets
+        key = (os.getpid(), self.connection_string, self.account_name, self.account_key, self.sas_token, self.endpoint_suffix, self.azure_ssl)
+        with _service_clients_lock:
+            client = _service_clients.get(key)
+            if client is None:
+                client = _service_clients[key] = self._get_service_client()
+        return client
+
+    @property
+    def client(self):
+        if self._client is None or self._client_pid != os.getpid():
+            self._client = self.service_client.get_container_client(self.azure_container)
+            self._client_pid = os.getpid()
+        return self._client
+
+    def _get_service_client(self):
+        options = {
+            **self.client_options,
+            'transport': _pooled_transport(),
+            # Blobs up to one block go in a single request, larger ones as
+            # blocks (uploads) or ranges (downloads)
+            'max_single_put_size': STORAGE_BLOCK_SIZE,
+            'max_block_size': STORAGE_BLOCK_SIZE,
+            'max_single_get_size': STORAGE_BLOCK_SIZE,
+            'max_chunk_get_size': STORAGE_BLOCK_SIZE,
+        }
+        if self.connection_string is not None:
+            # AzureStorage drops client options for connection strings
+            return BlobServiceClient.from_connection_string(self.connection_string, **options)
+        # AzureStorage builds the client from self.client_options
+        default_options = self.client_options
+        self.client_options = options
+        try:
+            return super()._get_service_client()
+        finally:
+            self.client_options = default_options
+
+    def _open(self, name, mode='rb'):
+        return MediaStorageFile(name, mode, self)
+
+    def url(self, name, expire=None, parameters=None, mode='r'):
+        if expire is not None or parameters or mode != 'r':
+            return super().url(name, expire=expire, parameters=parameters, mode=mode)
+        return self.urls([name])[name]
+
+    def urls(self, names):
+        """Read URLs for many names at once; misses are signed in one pass with a shared expiry."""
+        keys = {(self.cache_key, name): name for name in names}
+        found = url_cache.get_many(list(keys))
+        missing = [name for key, name in keys.items() if key not in found]
+        if missing:
+            built = self._build_urls(missing)
+            ttl = self.expiration_secs // 2 if self.expiration_secs else STORAGE_URL_CACHE_TTL
+            url_cache.set_many({(self.cache_key, name): url for name, url in built.items()}, ttl)
+            found.update({(self.cache_key, name): url for name, url in built.items()})
+        return {name: found[key] for key, name in keys.items()}
+
+    @cached_property
+    def cache_key(self):
+        # Instances configured alike share cache entries
+        return (self.account_name, self.azure_container, self.location, self.expiration_secs, self.base_url)
+
+    @cached_property
+    def base_url(self):
+        if MEDIA_CDN_BASE_URL:
+            return MEDIA_CDN_BASE_URL.rstrip('/')
+        parsed = urlparse(self.client.url)
+        if self.custom_domain:
+            parsed = parsed._replace(netloc=self.custom_domain)
+        return urlunparse(parsed._replace(query='')).rstrip('/')
+
+    def _build_urls(self, names):
+        # Same URLs as AzureStorage.url, minus a client object and a URL
+        # parse per name
+        expire = self.expiration_secs
+        if expire:
+            expiry = self._expire_at(expire)
+            delegation_key = self.get_user_delegation_key(expiry)
+            permission = BlobSasPermissions(read=True)
+        urls = {}
+        for name in names:
+            path = self._get_valid_path(name)
+            url = f'{self.base_url}/{quote(path, safe="~/")}'
+            if expire:
+                url += '?' + generate_blob_sas(
+                    self.account_name,
+                    self.azure_container,
+                    path,
+                    account_key=self.account_key,
+                    user_delegation_key=delegation_key,
+                    permission=permission,
+                    expiry=expiry,
+                )
+            urls[name] = url
+        return urls
+
+
+@functools.cache
+def get_media_storage():
+    """
+    The process-wide storage for uploaded media. Model fields take this
+    callable rather than an instance, so every field shares it.
+    """
+    return MediaStorage()
+
+
+def download_to(storage, name, handle, concurrency=STORAGE_TRANSFER_CONCURRENCY):
+    """Copy a stored file into an open binary file, as parallel ranged reads where the storage allows."""
+    if isinstance(storage, AzureStorage):
+        blob = storage.client.download_blob(storage._get_valid_path(name), max_concurrency=concurrency, timeout=storage.timeout)
+        blob.readinto(handle)
+        return
+    with storage.open(name, 'rb') as source:
+        shutil.copyfileobj(source, handle, 4 * 1024 * 1024)
+
+
+def prefetch_urls(objects, *fields):
+    """
+    Resolve, in one batch per storage, the URLs of the given file fields of
+    a page of objects, renditions included, so rendering the page finds
+    them in the cache. Fields may span relations: 'user.profile_pic'.
+    """
+    from .images import RENDITION_FORMATS, renditions_of
+
+    pending = {}
+    for obj in objects:
+        for field in fields:
+            fieldfile = obj
+            for attr in field.split('.'):
+                fieldfile = getattr(fieldfile, attr, None)
+            if not fieldfile or not hasattr(fieldfile.storage, 'urls'):
+                continue
+            names = pending.setdefault(id(fieldfile.storage), (fieldfile.storage, set()))[1]
+            names.add(fieldfile.name)
+            renditions = renditions_of(fieldfile)
+            if renditions is not None:
+                names.update(name for fmt in RENDITION_FORMATS for _, name in renditions.get(fmt, []))
+    for storage, names in pending.values():
+        storage.urls(names)
@@ -0,0 +1,34 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from core.images import rendition_url, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(fieldfile, sizes, **attrs):
+    """
+    A lazily loaded <picture> for an image field: a WebP srcset with a JPEG
+    <img> fallback, so the browser fetches the smallest rendition that
+    fills ``sizes``. Keyword arguments become <img> attributes. Before the
+    renditions exist it falls back to the original; empty fields render
+    nothing.
+    """
+    if not fieldfile:
+        return ''
+    attrs = {'loading': 'lazy', 'decoding': 'async', **attrs}
+    webp, jpeg = srcset(fieldfile, 'webp'), srcset(fieldfile, 'jpeg')
+    if not jpeg:
+        return format_html('<img src="{}"{}>', fieldfile.url, flatatt(attrs))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        webp, sizes, rendition_url(fieldfile, 0), jpeg, sizes, flatatt(attrs),
+    )
+
+
+@register.filter
+def rendition(fieldfile, width):
+    """URL of the JPEG rendition closest to ``width`` pixels, e.g. for a <video> poster."""
+    return rendition_url(fieldfile, int(width))
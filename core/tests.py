@@ -1,3 +1,32 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from videos.models import Video
+from .pagination import KeysetPaginator, encode_cursor
+
+User = get_user_model()
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        creator = User.objects.create_user(username='creator', password='testpass123')
+        for i in range(3):
+            Video.objects.create(user=creator, title=f'Clip {i}', video_file='videos/sample.mp4')
+
+    def test_tampered_cursor_yields_first_page(self):
+        paginator = KeysetPaginator(Video.objects.all(), 2)
+        first = [video.pk for video in paginator.get_page()]
+        for values in (['x', 'y'], [None, 1], [{}, []]):
+            with self.subTest(values=values):
+                page = paginator.get_page(encode_cursor('n', values))
+                self.assertEqual([video.pk for video in page], first)
+                self.assertFalse(page.has_previous())
+                self.assertIsNone(paginator.seek(encode_cursor('p', values)))
+
+    def test_feeds_survive_tampered_cursors(self):
+        cursor = encode_cursor('n', ['x', 'y'])
+        for url in (reverse('core:home'), reverse('videos:search'), reverse('users:profile', args=['creator'])):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 200)
@@ -1,17 +1,36 @@
 from django.shortcuts import render
 from videos.models import Video
-from interactions.models import View
-from django.core.paginator import Paginator
+from .featured import featured_videos
+from .pagination import KeysetPaginator
+from .storage import prefetch_urls
+
+# Feed sort modes; the score-backed orderings are served by VideoScore indexes
+SORT_ORDERINGS = {
+    'newest': ('-created_at', '-pk'),
+    'popular': ('-score__popular', '-score__video_id'),
+    'trending': ('-score__trending', '-score__video_id'),
+}
 
 def home(request):
-    videos = Video.objects.filter(visibility='public').order_by('-created_at')
+    sort = request.GET.get('sort')
+    if sort not in SORT_ORDERINGS:
+        sort = 'newest'
+
+    videos = Video.objects.visible_to(request.user).with_card_data()
+    if sort != 'newest':
+        # Inner join on the score table; unscored videos appear after the next refresh
+        videos = videos.filter(score__isnull=False).select_related('score')
     
-    # Pagination
-    paginator = Paginator(videos, 10)  # Show 10 videos per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination: no COUNT(*) and no OFFSET, however deep the page
+    paginator = KeysetPaginator(videos, 10, ordering=SORT_ORDERINGS[sort])  # Show 10 videos per page
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    # The shelf is precomputed by build_featured_shelf; only the first page shows it
+    featured = featured_videos() if not request.GET.get('cursor') else []
+    prefetch_urls([*featured, *page_obj], 'thumbnail', 'user.profile_pic')
     
     context = {
         'page_obj': page_obj,
+        'sort': sort,
+        'featured_videos': featured,
     }
     return render(request, 'core/home.html', context)
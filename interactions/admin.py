@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Like, Comment, View
+from .comments import reply_totals
+from .models import Like, Comment, View, VideoViewRollup
 
 @admin.register(Like)
 class LikeAdmin(admin.ModelAdmin):
@@ -44,8 +45,11 @@ class CommentAdmin(admin.ModelAdmin):
         return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
     truncated_text.short_description = 'Comment Text'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(reply_total=reply_totals())
+
     def reply_count(self, obj):
-        return obj.reply_count
+        return obj.reply_total
     reply_count.short_description = 'Replies'
 
 @admin.register(View)
@@ -63,4 +67,12 @@ class ViewAdmin(admin.ModelAdmin):
 
     def user_display(self, obj):
         return obj.user.username if obj.user else 'Anonymous'
-    user_display.short_description = 'User'
\ No newline at end of file
+    user_display.short_description = 'User'
+
+@admin.register(VideoViewRollup)
+class VideoViewRollupAdmin(admin.ModelAdmin):
+    list_display = ('video', 'hour', 'views', 'authenticated_views')
+    list_filter = ('hour',)
+    search_fields = ('video__title',)
+    raw_id_fields = ('video',)
+    readonly_fields = ('video', 'hour', 'views', 'authenticated_views')
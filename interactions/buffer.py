@@ -0,0 +1,195 @@
+import atexit
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from videos.models import Video
+from .models import View
+from .uniques import merge_viewers
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Buffering trades durability for latency: a crash loses at most the views
+# enqueued since the last flush, i.e. FLUSH_INTERVAL seconds or BATCH_SIZE
+# events. Set VIEW_BUFFER_ENABLED = False to write every view synchronously.
+VIEW_BUFFER_ENABLED = getattr(settings, 'VIEW_BUFFER_ENABLED', True)
+VIEW_BUFFER_BATCH_SIZE = getattr(settings, 'VIEW_BUFFER_BATCH_SIZE', 500)
+VIEW_BUFFER_FLUSH_INTERVAL = getattr(settings, 'VIEW_BUFFER_FLUSH_INTERVAL', 2.0)
+# Upper bound on events held in memory while the database is unreachable;
+# beyond it new views are dropped (and counted) instead of growing the heap
+VIEW_BUFFER_MAX_PENDING = getattr(settings, 'VIEW_BUFFER_MAX_PENDING', 50_000)
+
+
+class ViewBuffer:
+    """
+    Write-behind queue for View rows. Requests append to an in-process list;
+    a daemon thread flushes it with one bulk INSERT plus one counter UPDATE
+    per distinct increment whenever the batch fills or the interval elapses.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=2.0, max_pending=50_000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._latencies = deque(maxlen=200)
+        self.enqueued = self.flushed = self.dropped = self.flushes = self.failed_flushes = 0
+
+    def add(self, video_id, user_id, viewer_key):
+        """Queue a view; returns False if it was dropped because the buffer is full."""
+        self._ensure_worker()
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending.append((video_id, user_id, viewer_key, timezone.now()))
+            self.enqueued += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Write everything queued so far; returns the number of views written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    live = self._live(batch)
+                    with self._lock:
+                        self.dropped += len(batch) - len(live)
+                    batch = live
+                    View.objects.bulk_create(
+                        [View(video_id=v, user_id=u, created_at=at) for v, u, _, at in batch],
+                        batch_size=self.batch_size,
+                    )
+                    # Videos sharing an increment are updated together, so a
+                    # batch costs a handful of UPDATEs rather than one per view
+                    by_increment = {}
+                    for video_id, views in Counter(v for v, _, _, _ in batch).items():
+                        by_increment.setdefault(views, []).append(video_id)
+                    for views, video_ids in by_increment.items():
+                        Video.objects.filter(pk__in=video_ids).update(view_count=F('view_count') + views)
+                    merge_viewers((v, timezone.localdate(at), key) for v, _, key, at in batch)
+            except IntegrityError:
+                # Bad rows would fail every retry and wedge the buffer behind them
+                logger.exception('Discarding %d buffered views that could not be written', len(batch))
+                with self._lock:
+                    self.failed_flushes += 1
+                    self.dropped += len(batch)
+                return 0
+            except Exception:
+                logger.exception('Flushing %d buffered views failed', len(batch))
+                with self._lock:
+                    self.failed_flushes += 1
+                    # Retry on the next flush, keeping the newest events within the bound
+                    retry = batch + self._pending
+                    self.dropped += max(0, len(retry) - self.max_pending)
+                    self._pending = retry[-self.max_pending:]
+                return 0
+
+            with self._lock:
+                self._latencies.append((time.perf_counter() - start) * 1000)
+                self.flushes += 1
+                self.flushed += len(batch)
+            return len(batch)
+
+    @staticmethod
+    def _live(batch):
+        """
+        The events whose video and viewer still exist. The reaper removes
+        deleted videos and closed accounts while their views may still be
+        queued; inserting those would violate the foreign keys.
+        """
+        video_ids = set(Video.objects.filter(pk__in={v for v, _, _, _ in batch}).values_list('pk', flat=True))
+        user_ids = set(
+            User.objects.filter(pk__in={u for _, u, _, _ in batch if u is not None}).values_list('pk', flat=True)
+        )
+        return [event for event in batch if event[0] in video_ids and (event[1] is None or event[1] in user_ids)]
+
+    def stats(self):
+        """Queue depth, throughput counters and flush latency for this process."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            oldest = self._pending[0][-1] if self._pending else None
+            return {
+                'pid': os.getpid(),
+                'enabled': VIEW_BUFFER_ENABLED,
+                'pending': len(self._pending),
+                'oldest_pending_seconds': (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+                'enqueued': self.enqueued,
+                'flushed': self.flushed,
+                'dropped': self.dropped,
+                'flushes': self.flushes,
+                'failed_flushes': self.failed_flushes,
+                'flush_ms_p50': statistics.median(latencies) if latencies else None,
+                'flush_ms_p95': latencies[int(len(latencies) * 0.95)] if latencies else None,
+                'flush_ms_max': latencies[-1] if latencies else None,
+            }
+
+    def _ensure_worker(self):
+        # A forked worker inherits the parent's list but not its thread
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pending = []
+                self._thread = None
+                self._pid = os.getpid()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='view-buffer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+view_buffer = ViewBuffer(
+    batch_size=VIEW_BUFFER_BATCH_SIZE,
+    flush_interval=VIEW_BUFFER_FLUSH_INTERVAL,
+    max_pending=VIEW_BUFFER_MAX_PENDING,
+)
+
+# Graceful shutdown (SIGTERM from gunicorn/uwsgi, Ctrl-C on runserver) drains the queue
+atexit.register(view_buffer.flush)
+
+
+def enqueue_view(video, user, viewer_key):
+    """
+    Record one view of ``video`` by ``user`` (None when anonymous), buffered
+    unless buffering is disabled. ``viewer_key`` feeds the unique-viewer sketch.
+    """
+    user_id = user.pk if user is not None else None
+    if VIEW_BUFFER_ENABLED:
+        if view_buffer.add(video.pk, user_id, viewer_key):
+            # Show the viewer their own view before the flush lands
+            video.view_count += 1
+        return
+    with transaction.atomic():
+        view = View.objects.create(video=video, user_id=user_id)
+        video.adjust_counts(view_count=1)
+        merge_viewers([(video.pk, timezone.localdate(view.created_at), viewer_key)])
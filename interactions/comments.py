@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils.timesince import timesince
+from core.pagination import KeysetPaginator, encode_cursor
+from core.storage import prefetch_urls
+from .models import Comment
+
+COMMENTS_PER_PAGE = getattr(settings, 'COMMENTS_PER_PAGE', 20)
+# Replies rendered under each comment; the rest load from
+# interactions:comment_replies when asked for
+REPLY_PREVIEW_SIZE = getattr(settings, 'COMMENT_REPLY_PREVIEW_SIZE', 3)
+REPLIES_PER_PAGE = getattr(settings, 'COMMENT_REPLIES_PER_PAGE', 20)
+
+# Conversations read oldest first
+REPLY_ORDERING = ('created_at', 'pk')
+
+
+def reply_totals():
+    """Correlated COUNT(*) of the direct replies to the outer comment."""
+    rows = (
+        Comment.objects.filter(parent=OuterRef('pk'))
+        .order_by()
+        .values('parent')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def comment_page(video, cursor=None, per_page=COMMENTS_PER_PAGE, preview=REPLY_PREVIEW_SIZE):
+    """
+    A page of the video's top-level comments, newest first. Each comes with
+    its author, ``reply_total``, its first ``preview`` replies as
+    ``reply_preview`` and, when there are more, ``replies_cursor`` for
+    fetching the ``hidden_replies`` others: two queries whatever the
+    thread sizes.
+    """
+    replies = Comment.objects.select_related('user').order_by(*REPLY_ORDERING)[:preview]
+    comments = (
+        Comment.objects.filter(video=video, parent=None)
+        .select_related('user')
+        .annotate(reply_total=reply_totals())
+        .prefetch_related(Prefetch('replies', queryset=replies, to_attr='reply_preview'))
+    )
+    page = KeysetPaginator(comments, per_page).get_page(cursor)
+    for comment in page:
+        shown = comment.reply_preview
+        comment.hidden_replies = comment.reply_total - len(shown)
+        comment.replies_cursor = (
+            encode_cursor('n', [shown[-1].created_at, shown[-1].pk])
+            if shown and comment.hidden_replies else None
+        )
+    prefetch_urls(page, 'user.profile_pic')
+    return page
+
+
+def reply_page(comment, cursor=None, per_page=REPLIES_PER_PAGE):
+    """A page of the direct replies to ``comment``, oldest first."""
+    replies = Comment.objects.filter(parent=comment).select_related('user')
+    return KeysetPaginator(replies, per_page, ordering=REPLY_ORDERING).get_page(cursor)
+
+
+def serialize_reply(reply):
+    return {
+        'id': reply.pk,
+        'text': reply.text,
+        'created_at': reply.created_at.isoformat(),
+        'timesince': timesince(reply.created_at),
+        'user': {
+            'username': reply.user.username,
+            'url': reverse('users:profile', args=[reply.user.username]),
+        },
+    }
@@ -0,0 +1,69 @@
+import hashlib
+import math
+import zlib
+
+import numpy as np
+
+DEFAULT_PRECISION = 12
+
+
+class HyperLogLog:
+    """
+    Cardinality sketch with 2**p one-byte registers. At the default p=12 the
+    standard error is about 1.6% whatever the number of distinct items, and
+    two sketches merge losslessly by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add(self, item):
+        if isinstance(item, str):
+            item = item.encode()
+        value = int.from_bytes(hashlib.blake2b(item, digest_size=8).digest(), 'big')
+        index = value >> (64 - self.precision)
+        remainder = value & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError('cannot merge sketches of different precision')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.exp2(-self.registers.astype(np.float64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def __len__(self):
+        return self.count()
+
+    def to_bytes(self):
+        """Precision byte followed by the zlib-compressed registers (mostly zeros for small sets)."""
+        return bytes([self.precision]) + zlib.compress(self.registers.tobytes(), 1)
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        precision = data[0]
+        registers = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8).copy()
+        if len(registers) != 1 << precision:
+            raise ValueError('corrupt sketch')
+        return cls(precision, registers)
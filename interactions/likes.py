@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.utils import timezone
+from videos.models import Video
+from .models import Like
+
+
+@dataclass(frozen=True)
+class LikeToggle:
+    """Outcome of toggle_like: the user's reaction before and after (True, False or None) and the fresh counters."""
+    is_like: bool
+    previous: object
+    current: object
+    like_count: int
+    dislike_count: int
+
+    @property
+    def action(self):
+        """'liked', 'unliked', 'disliked' or 'undisliked', as the like endpoints report it."""
+        return ('un' if self.current is None else '') + ('liked' if self.is_like else 'disliked')
+
+    @property
+    def status(self):
+        return {True: 'liked', False: 'disliked', None: 'none'}[self.current]
+
+
+def toggle_like(user, video, is_like=True):
+    """
+    Toggle ``user``'s like (or dislike, ``is_like=False``) of ``video``:
+    the same reaction again removes it, the opposite one replaces it. The
+    row change and both counter updates happen in a single statement, sent
+    in one round trip behind a lock on the video row, so concurrent clicks
+    can neither fail on the unique constraint nor let the counters drift.
+    ``video``'s counters are refreshed from the result.
+    """
+    like, video_table = Like._meta.db_table, Video._meta.db_table
+    params = {'user': user.pk, 'video': video.pk, 'is_like': is_like, 'now': timezone.now()}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            # The counter UPDATE takes this lock anyway; taking it first, in
+            # its own statement, means the toggle reads the reaction only
+            # after any concurrent toggle on the video has committed. Inside
+            # one statement the read would use a snapshot from before the wait
+            f'''
+            SELECT 1 FROM {video_table} WHERE id = %(video)s FOR NO KEY UPDATE;
+            WITH existing AS (
+                SELECT id, is_like FROM {like}
+                WHERE user_id = %(user)s AND video_id = %(video)s
+            ), removed AS (
+                DELETE FROM {like} USING existing
+                WHERE {like}.id = existing.id AND existing.is_like = %(is_like)s
+            ), changed AS (
+                UPDATE {like} SET is_like = %(is_like)s FROM existing
+                WHERE {like}.id = existing.id AND existing.is_like <> %(is_like)s
+                RETURNING {like}.is_like
+            ), added AS (
+                INSERT INTO {like} (user_id, video_id, is_like, created_at)
+                SELECT %(user)s, %(video)s, %(is_like)s, %(now)s
+                WHERE NOT EXISTS (SELECT 1 FROM existing)
+                ON CONFLICT (user_id, video_id) DO NOTHING
+                RETURNING is_like
+            ), states AS (
+                SELECT (SELECT is_like FROM existing) AS before_state,
+                       COALESCE((SELECT is_like FROM changed), (SELECT is_like FROM added)) AS after_state
+            ), counted AS (
+                UPDATE {video_table} SET
+                    like_count = like_count + (after_state IS TRUE)::int - (before_state IS TRUE)::int,
+                    dislike_count = dislike_count + (after_state IS FALSE)::int - (before_state IS FALSE)::int
+                FROM states
+                WHERE id = %(video)s
+                RETURNING like_count, dislike_count
+            )
+            SELECT before_state, after_state, like_count, dislike_count FROM states, counted
+            ''',
+            params,
+        )
+        previous, current, like_count, dislike_count = cursor.fetchone()
+
+    if previous is None and current is None:
+        # A writer outside this function inserted the row first and this
+        # toggle yielded to it, changing nothing; report what is stored
+        current = Like.objects.filter(user=user, video=video).values_list('is_like', flat=True).first()
+    video.like_count, video.dislike_count = like_count, dislike_count
+    return LikeToggle(is_like, previous, current, like_count, dislike_count)
@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from interactions import buffer
+from interactions.buffer import view_buffer
+from videos.models import Video
+
+
+class Command(BaseCommand):
+    help = (
+        'Times anonymous watch-page requests with synchronous view writes and with the '
+        'write-behind buffer. Both modes insert real View rows; run it against a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Watch-page requests per mode')
+        parser.add_argument('--videos', type=int, default=50, help='Distinct public videos to spread the requests over')
+
+    def handle(self, *args, **options):
+        video_ids = list(Video.objects.filter(visibility='public').order_by('-created_at').values_list('pk', flat=True)[:options['videos']])
+        if not video_ids:
+            raise CommandError('No public videos to watch; seed some first.')
+        urls = [reverse('videos:watch', args=[video_id]) for video_id in video_ids]
+
+        setup_test_environment()  # lets the test client through ALLOWED_HOSTS
+        client = Client()
+        client.get(urls[0])  # warm templates and connections
+
+        enabled = buffer.VIEW_BUFFER_ENABLED
+        try:
+            buffer.VIEW_BUFFER_ENABLED = False
+            sync_ms = self.run(client, urls, options['requests'])
+            buffer.VIEW_BUFFER_ENABLED = True
+            buffered_ms = self.run(client, urls, options['requests'])
+        finally:
+            buffer.VIEW_BUFFER_ENABLED = enabled
+
+        start = time.perf_counter()
+        drained = view_buffer.flush()
+        drain_ms = (time.perf_counter() - start) * 1000
+
+        self.stdout.write(f'{"mode":<12}{"p50":>10}{"p95":>10}{"mean":>10}')
+        for mode, timings in (('sync', sync_ms), ('buffered', buffered_ms)):
+            self.stdout.write(
+                f'{mode:<12}{self.pct(timings, 50):>8.2f}ms{self.pct(timings, 95):>8.2f}ms{statistics.fmean(timings):>8.2f}ms'
+            )
+        stats = view_buffer.stats()
+        self.stdout.write(
+            f'Buffer: {stats["flushes"]} flushes, {stats["flushed"]} views written, {stats["dropped"]} dropped, '
+            f'flush p50 {stats["flush_ms_p50"] or 0:.1f}ms; final drain of {drained} views took {drain_ms:.1f}ms.'
+        )
+
+    @staticmethod
+    def run(client, urls, requests):
+        timings = []
+        for i in range(requests):
+            start = time.perf_counter()
+            response = client.get(urls[i % len(urls)])
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{urls[i % len(urls)]} returned {response.status_code}')
+        return timings
+
+    @staticmethod
+    def pct(timings, percentile):
+        if len(timings) < 2:
+            return timings[0]
+        return statistics.quantiles(timings, n=100, method='inclusive')[percentile - 1]
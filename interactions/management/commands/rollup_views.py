@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from interactions.rollups import VIEW_RETENTION_DAYS, compact_views, roll_up_views
+
+
+class Command(BaseCommand):
+    help = 'Folds new View rows into the hourly rollups, then compacts old raw rows; schedule it every few minutes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100_000, help='View ids aggregated per transaction')
+        parser.add_argument('--compact-days', type=int, default=VIEW_RETENTION_DAYS, help='Delete rolled-up raw rows older than this')
+        parser.add_argument('--compact-batch-size', type=int, default=5000, help='Raw rows deleted per transaction')
+        parser.add_argument('--archive', help='Append deleted raw rows to this gzipped CSV file')
+        parser.add_argument('--no-compact', action='store_true', help='Only roll up; keep all raw rows')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        folded = roll_up_views(batch_size=options['batch_size'])
+        self.stdout.write(f'Rolled up {folded} views in {time.perf_counter() - start:.1f}s.')
+
+        if not options['no_compact']:
+            start = time.perf_counter()
+            removed = compact_views(
+                days=options['compact_days'],
+                batch_size=options['compact_batch_size'],
+                archive=options['archive'],
+            )
+            self.stdout.write(f'Compacted {removed} raw views in {time.perf_counter() - start:.1f}s.')
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='view',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
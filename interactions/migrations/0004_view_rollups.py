@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0003_view_created_at_default'),
+        ('videos', '0006_videoneighbor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VideoViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('authenticated_views', models.PositiveIntegerField(default=0)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_rollups', to='videos.video')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='videoviewrollup_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('video', 'hour'), name='unique_video_view_hour')],
+            },
+        ),
+    ]
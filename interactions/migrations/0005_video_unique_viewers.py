@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0004_view_rollups'),
+        ('videos', '0006_videoneighbor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoUniqueViewers',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sketch', models.BinaryField()),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unique_viewer_sketches', to='videos.video')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video', 'day'), name='unique_video_viewers_day')],
+            },
+        ),
+    ]
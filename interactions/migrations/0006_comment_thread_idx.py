@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0005_video_unique_viewers'),
+        ('videos', '0014_tag_video_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['video', 'parent', 'created_at', 'id'], name='comment_thread_idx'),
+        ),
+    ]
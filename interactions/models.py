@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from videos.models import Video
 
@@ -26,6 +27,11 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pages of a video's top-level comments and of each
+            # comment's replies
+            models.Index(fields=['video', 'parent', 'created_at', 'id'], name='comment_thread_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} commented on {self.video.title}'
@@ -37,7 +43,49 @@ class Comment(models.Model):
 class View(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='views')
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the view happened, not when a buffered batch was flushed
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return f'View on {self.video.title} by {self.user.username if self.user else "Anonymous"}'
+
+class VideoViewRollup(models.Model):
+    """Views per video per hour, folded in from View rows by the rollup_views command."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='view_rollups')
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    authenticated_views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'hour'], name='unique_video_view_hour'),
+        ]
+        indexes = [
+            models.Index(fields=['hour'], name='videoviewrollup_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.views} views on {self.video_id} at {self.hour:%Y-%m-%d %H:00}'
+
+class RollupWatermark(models.Model):
+    """Highest source primary key already folded into a rollup table."""
+    name = models.CharField(max_length=50, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name} @ {self.position}'
+
+class VideoUniqueViewers(models.Model):
+    """HyperLogLog sketch of the distinct viewers of a video on one day (see interactions.hll)."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='unique_viewer_sketches')
+    day = models.DateField()
+    sketch = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'day'], name='unique_video_viewers_day'),
+        ]
+
+    def __str__(self):
+        return f'Unique viewers of {self.video_id} on {self.day}'
@@ -0,0 +1,136 @@
+import csv
+import gzip
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import IntegerField, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import RollupWatermark, VideoViewRollup, View
+
+VIEW_ROLLUP = 'video_view_rollup'
+
+# Raw View rows are kept this long for per-user signals (recommendation
+# co-views) and deleted afterwards; counts live on in the rollup table
+VIEW_RETENTION_DAYS = getattr(settings, 'VIEW_RETENTION_DAYS', 90)
+
+
+def _watermark():
+    return RollupWatermark.objects.get_or_create(name=VIEW_ROLLUP)[0].position
+
+
+def watermark_subquery():
+    """The rollup position as a subquery, read in the same snapshot as the outer statement."""
+    return Coalesce(
+        Subquery(RollupWatermark.objects.filter(name=VIEW_ROLLUP).values('position')[:1]),
+        0,
+    )
+
+
+def _committed_high_water():
+    """
+    Highest View pk such that every lower pk is committed. The SHARE lock
+    waits out in-flight inserts (a buffer flush, typically milliseconds) and
+    is released as soon as the max is read, so no id below it can still appear.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {connection.ops.quote_name(View._meta.db_table)} IN SHARE MODE')
+        return View.objects.aggregate(high=Max('pk'))['high'] or 0
+
+
+def roll_up_views(batch_size=100_000):
+    """
+    Fold View rows above the watermark into hourly rollups. Each pk range is
+    aggregated and upserted in the same transaction that advances the
+    watermark, so a crash never double-counts or skips rows. Returns the
+    number of raw rows folded in.
+    """
+    position = _watermark()
+    high = _committed_high_water()
+    rollup, view = VideoViewRollup._meta.db_table, View._meta.db_table
+    folded = 0
+    while position < high:
+        upper = min(position + batch_size, high)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                WITH hourly AS (
+                    SELECT video_id, date_trunc('hour', created_at) AS hour,
+                           COUNT(*) AS views, COUNT(user_id) AS authenticated_views
+                    FROM {view}
+                    WHERE id > %s AND id <= %s
+                    GROUP BY 1, 2
+                ), upserted AS (
+                    INSERT INTO {rollup} (video_id, hour, views, authenticated_views)
+                    SELECT video_id, hour, views, authenticated_views FROM hourly
+                    ON CONFLICT (video_id, hour) DO UPDATE SET
+                        views = {rollup}.views + EXCLUDED.views,
+                        authenticated_views = {rollup}.authenticated_views + EXCLUDED.authenticated_views
+                )
+                SELECT COALESCE(SUM(views), 0) FROM hourly
+                ''',
+                [position, upper],
+            )
+            folded += cursor.fetchone()[0]
+            RollupWatermark.objects.filter(name=VIEW_ROLLUP).update(position=upper, updated_at=timezone.now())
+        position = upper
+    return folded
+
+
+def compact_views(days=VIEW_RETENTION_DAYS, batch_size=5000, archive=None):
+    """
+    Delete raw View rows older than ``days`` that are already in the rollups,
+    ``batch_size`` rows per short transaction so the table is never locked
+    for long. With ``archive`` (a path), deleted rows are appended to a
+    gzipped CSV first. Returns the number of rows removed.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    position = _watermark()
+    view = View._meta.db_table
+    removed = last_id = 0
+    out = gzip.open(archive, 'at', newline='') if archive else None
+    try:
+        writer = csv.writer(out) if out else None
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'''
+                    DELETE FROM {view} WHERE id IN (
+                        SELECT id FROM {view}
+                        WHERE id > %s AND id <= %s AND created_at < %s
+                        ORDER BY id
+                        LIMIT %s
+                    )
+                    RETURNING id, video_id, user_id, created_at
+                    ''',
+                    [last_id, position, cutoff, batch_size],
+                )
+                rows = cursor.fetchall()
+                if writer:
+                    writer.writerows((pk, video_id, user_id, created_at.isoformat()) for pk, video_id, user_id, created_at in rows)
+            removed += len(rows)
+            # Resume after this batch instead of rescanning the dead tuples it left
+            last_id = max((row[0] for row in rows), default=last_id)
+            if len(rows) < batch_size:
+                return removed
+    finally:
+        if out:
+            out.close()
+
+
+def rolled_up_views(**filters):
+    """Correlated SUM of rolled-up views for the outer video."""
+    rows = (
+        VideoViewRollup.objects.filter(video=OuterRef('pk'), **filters)
+        .order_by()
+        .values('video')
+        .annotate(total=Sum('views'))
+        .values('total')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def pending_views():
+    """Raw View rows not yet folded into the rollups."""
+    return View.objects.filter(pk__gt=watermark_subquery())
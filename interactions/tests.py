@@ -1,3 +1,99 @@
-from django.test import TestCase
+import threading
+import uuid
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from videos.models import Video
+from .buffer import ViewBuffer
+from .likes import toggle_like
+from .models import Like, View
+
+User = get_user_model()
+
+
+class ToggleLikeTests(TransactionTestCase):
+    """The like toggle must keep rows and counters consistent under concurrent clicks."""
+
+    def setUp(self):
+        creator = User.objects.create_user(username='creator', password='testpass123')
+        self.video = Video.objects.create(user=creator, title='Clip', video_file='videos/sample.mp4')
+
+    def assertCountsMatchRows(self):
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.like_count, Like.objects.filter(video=self.video, is_like=True).count())
+        self.assertEqual(self.video.dislike_count, Like.objects.filter(video=self.video, is_like=False).count())
+
+    def hammer(self, calls):
+        """Run each ``(user, is_like)`` toggle on its own thread, all released at once."""
+        barrier = threading.Barrier(len(calls))
+        errors = []
+
+        def click(user, is_like):
+            try:
+                barrier.wait()
+                toggle_like(user, Video.objects.get(pk=self.video.pk), is_like)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=click, args=call) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_toggle_sequence(self):
+        user = User.objects.create_user(username='fan', password='testpass123')
+        steps = [
+            (True, 'liked', True, 1, 0),
+            (True, 'unliked', None, 0, 0),
+            (False, 'disliked', False, 0, 1),
+            (True, 'liked', True, 1, 0),
+            (False, 'disliked', False, 0, 1),
+            (False, 'undisliked', None, 0, 0),
+        ]
+        for is_like, action, current, likes, dislikes in steps:
+            result = toggle_like(user, self.video, is_like)
+            self.assertEqual(
+                (result.action, result.current, result.like_count, result.dislike_count),
+                (action, current, likes, dislikes),
+            )
+            self.assertEqual((self.video.like_count, self.video.dislike_count), (likes, dislikes))
+            self.assertCountsMatchRows()
+
+    def test_concurrent_likes_from_many_users(self):
+        users = [User.objects.create_user(username=f'fan{i}', password='testpass123') for i in range(16)]
+        self.hammer([(user, True) for user in users])
+        self.assertEqual(Like.objects.filter(video=self.video).count(), 16)
+        self.assertCountsMatchRows()
+
+    def test_concurrent_double_clicks_from_one_user(self):
+        user = User.objects.create_user(username='fan', password='testpass123')
+        for _ in range(5):
+            self.hammer([(user, is_like) for is_like in [True, False] * 4])
+            self.assertLessEqual(Like.objects.filter(user=user, video=self.video).count(), 1)
+            self.assertCountsMatchRows()
+
+
+class ViewBufferTests(TestCase):
+    def test_flush_skips_views_of_reaped_videos_and_users(self):
+        creator = User.objects.create_user(username='creator', password='testpass123')
+        viewer = User.objects.create_user(username='viewer', password='testpass123')
+        video = Video.objects.create(user=creator, title='Clip', video_file='videos/sample.mp4')
+        buffer = ViewBuffer()
+        buffer._ensure_worker = lambda: None  # flushed by hand below
+        buffer.add(video.pk, viewer.pk, 'a')
+        buffer.add(video.pk, None, 'b')
+        buffer.add(uuid.uuid4(), None, 'c')
+        buffer.add(video.pk, viewer.pk + 1000, 'd')
+
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(View.objects.filter(video=video).count(), 2)
+        video.refresh_from_db()
+        self.assertEqual(video.view_count, 2)
+        stats = buffer.stats()
+        self.assertEqual((stats['pending'], stats['dropped'], stats['failed_flushes']), (0, 2, 0))
@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.crypto import salted_hmac
+from .hll import HyperLogLog
+from .models import VideoUniqueViewers
+
+
+def viewer_key(request):
+    """
+    Stable identity for unique-viewer counting: the user id when logged in,
+    otherwise a keyed hash of the session (or client IP and user agent when
+    there is no session), so raw addresses never reach the sketches.
+    """
+    if request.user.is_authenticated:
+        return f'u:{request.user.pk}'
+    session_key = getattr(request, 'session', None) and request.session.session_key
+    if session_key:
+        source = f's:{session_key}'
+    else:
+        ip = request.headers.get('X-Forwarded-For', '').split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+        source = f'a:{ip}|{request.headers.get("User-Agent", "")}'
+    return 'h:' + salted_hmac('interactions.viewer_key', source).hexdigest()[:32]
+
+
+def merge_viewers(entries):
+    """
+    Fold (video_id, day, viewer_key) entries into the per-day sketches.
+    Rows are created empty if missing and then locked in primary-key order,
+    so concurrent flushes from several workers merge rather than overwrite.
+    """
+    sketches = defaultdict(HyperLogLog)
+    for video_id, day, key in entries:
+        sketches[video_id, day].add(key)
+    if not sketches:
+        return
+
+    videos_by_day = defaultdict(list)
+    for video_id, day in sketches:
+        videos_by_day[day].append(video_id)
+    matching = Q()
+    for day, video_ids in videos_by_day.items():
+        matching |= Q(day=day, video_id__in=video_ids)
+
+    empty = HyperLogLog().to_bytes()
+    with transaction.atomic():
+        # Sorted so concurrent flushes claim the unique index in the same order
+        VideoUniqueViewers.objects.bulk_create(
+            [VideoUniqueViewers(video_id=video_id, day=day, sketch=empty) for video_id, day in sorted(sketches)],
+            ignore_conflicts=True,
+        )
+        rows = list(VideoUniqueViewers.objects.select_for_update().filter(matching).order_by('pk'))
+        for row in rows:
+            row.sketch = HyperLogLog.from_bytes(row.sketch).merge(sketches[row.video_id, row.day]).to_bytes()
+        VideoUniqueViewers.objects.bulk_update(rows, ['sketch'])
+
+
+def unique_viewers(video, since=None, until=None):
+    """
+    Approximate distinct viewers of ``video`` between two dates (inclusive,
+    open-ended when omitted), merging one small sketch per day.
+    """
+    sketches = VideoUniqueViewers.objects.filter(video=video)
+    if since is not None:
+        sketches = sketches.filter(day__gte=since)
+    if until is not None:
+        sketches = sketches.filter(day__lte=until)
+    merged = HyperLogLog()
+    for sketch in sketches.values_list('sketch', flat=True).iterator():
+        merged.merge(HyperLogLog.from_bytes(sketch))
+    return merged.count()
@@ -1,29 +1,21 @@
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from videos.models import Video
-from .models import Like, Comment, View
-from django.http import JsonResponse
+from videos.views import can_watch
+from .models import Comment
+from .buffer import enqueue_view, view_buffer
+from .comments import reply_page, serialize_reply
+from .likes import toggle_like
+from .uniques import viewer_key
+from django.http import Http404, JsonResponse
+from django.db import transaction
 
 @login_required
 def like_video(request, video_id):
     video = get_object_or_404(Video, id=video_id)
-    like, created = Like.objects.get_or_create(
-        user=request.user,
-        video=video,
-        defaults={'is_like': True}
-    )
-    
-    if not created:
-        if like.is_like:
-            like.delete()
-            action = 'unliked'
-        else:
-            like.is_like = True
-            like.save()
-            action = 'liked'
-    else:
-        action = 'liked'
+    action = toggle_like(request.user, video, is_like=True).action
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
@@ -38,22 +30,7 @@ def like_video(request, video_id):
 @login_required
 def dislike_video(request, video_id):
     video = get_object_or_404(Video, id=video_id)
-    like, created = Like.objects.get_or_create(
-        user=request.user,
-        video=video,
-        defaults={'is_like': False}
-    )
-    
-    if not created:
-        if not like.is_like:
-            like.delete()
-            action = 'undisliked'
-        else:
-            like.is_like = False
-            like.save()
-            action = 'disliked'
-    else:
-        action = 'disliked'
+    action = toggle_like(request.user, video, is_like=False).action
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
@@ -81,12 +58,14 @@ def add_comment(request, video_id):
                     messages.error(request, 'Parent comment not found.')
                     return redirect('videos:watch', video_id=video_id)
             
-            Comment.objects.create(
-                user=request.user,
-                video=video,
-                text=text,
-                parent=parent
-            )
+            with transaction.atomic():
+                Comment.objects.create(
+                    user=request.user,
+                    video=video,
+                    text=text,
+                    parent=parent
+                )
+                video.adjust_counts(comment_count=1)
             messages.success(request, 'Comment added successfully!')
         else:
             messages.error(request, 'Comment cannot be empty.')
@@ -102,32 +81,48 @@ def delete_comment(request, comment_id):
         messages.error(request, 'You are not authorized to delete this comment.')
         return redirect('videos:watch', video_id=comment.video.id)
     
-    video_id = comment.video.id
-    comment.delete()
+    video = comment.video
+    video_id = video.id
+    with transaction.atomic():
+        # Replies cascade with the comment, so count everything that went
+        _, deleted = comment.delete()
+        video.adjust_counts(comment_count=-deleted.get(Comment._meta.label, 0))
     messages.success(request, 'Comment deleted successfully!')
     return redirect('videos:watch', video_id=video_id)
 
+def comment_replies(request, comment_id):
+    """
+    JSON page of the replies to a comment, oldest first, for the watch
+    page's "Show more replies"; pass the returned ``next_cursor`` back as
+    ``cursor`` for the page after.
+    """
+    comment = get_object_or_404(
+        Comment.objects.select_related('video__user'), id=comment_id, video__deleted_at__isnull=True,
+    )
+    if not can_watch(comment.video, request.user):
+        raise Http404
+    page = reply_page(comment, request.GET.get('cursor'))
+    return JsonResponse({
+        'replies': [serialize_reply(reply) for reply in page],
+        'next_cursor': page.next_cursor,
+    })
+
 def record_view(request, video_id):
-    video = get_object_or_404(Video, id=video_id)
-    
-    # Check visibility before recording view
-    if video.visibility == 'private' and video.user != request.user:
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'message': 'Private video'}, status=403)
-        messages.error(request, 'This video is private.')
-        return redirect('core:home')
-    
-    elif video.visibility == 'followers' and not request.user.is_authenticated:
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'message': 'Login required'}, status=403)
-        messages.error(request, 'You need to login to view this video.')
-        return redirect('users:login')
-    
-    elif video.visibility == 'followers' and video.user != request.user and not video.user.followers.filter(id=request.user.id).exists():
+    video = Video.objects.visible_to(request.user).filter(id=video_id).first()
+    
+    # Check visibility before recording view; only a refusal needs to know why
+    if video is None:
+        hidden = get_object_or_404(Video, id=video_id)
+        if hidden.visibility == 'private':
+            message, detail, target = 'Private video', 'This video is private.', 'core:home'
+        elif not request.user.is_authenticated:
+            message, detail, target = 'Login required', 'You need to login to view this video.', 'users:login'
+        else:
+            message, detail, target = 'Followers only', 'This video is only available to followers.', 'core:home'
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'message': 'Followers only'}, status=403)
-        messages.error(request, 'This video is only available to followers.')
-        return redirect('core:home')
+            return JsonResponse({'status': 'error', 'message': message}, status=403)
+        messages.error(request, detail)
+        return redirect(target)
     
     # Record view
     if request.user.is_authenticated:
@@ -135,17 +130,13 @@ def record_view(request, video_id):
     else:
         viewer = None
     
-    # Check if view already exists for authenticated users to prevent duplicate counts
-    if viewer:
-        view, created = View.objects.get_or_create(user=viewer, video=video)
-    else:
-        # For anonymous users, just create a new view
-        View.objects.create(user=viewer, video=video)
+    # Every view counts; distinct viewers are estimated from the daily sketches instead
+    enqueue_view(video, viewer, viewer_key(request))
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
             'status': 'success',
-            'view_count': video.views.count(),
+            'view_count': video.view_count,
         })
     
     return redirect('videos:watch', video_id=video_id)
@@ -156,34 +147,21 @@ def toggle_like_ajax(request, video_id):
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         video = get_object_or_404(Video, id=video_id)
         action = request.POST.get('action', 'like')
-        
-        like, created = Like.objects.get_or_create(
-            user=request.user,
-            video=video
-        )
-        
-        if action == 'like':
-            if not created and like.is_like:
-                like.delete()
-                status = 'unliked'
-            else:
-                like.is_like = True
-                like.save()
-                status = 'liked'
-        elif action == 'dislike':
-            if not created and not like.is_like:
-                like.delete()
-                status = 'undisliked'
-            else:
-                like.is_like = False
-                like.save()
-                status = 'disliked'
-        
+        if action not in ('like', 'dislike'):
+            return JsonResponse({'status': 'error', 'message': 'Invalid action'}, status=400)
+
+        result = toggle_like(request.user, video, is_like=action == 'like')
         return JsonResponse({
             'status': 'success',
-            'action': status,
-            'like_count': video.like_count,
-            'user_like_status': 'liked' if Like.objects.filter(user=request.user, video=video, is_like=True).exists() else 'disliked' if Like.objects.filter(user=request.user, video=video, is_like=False).exists() else 'none'
+            'action': result.action,
+            'like_count': result.like_count,
+            'dislike_count': result.dislike_count,
+            'user_like_status': result.status,
         })
     
-    return JsonResponse({'status': 'error', 'message': 'Invalid request'}, status=400)
\ No newline at end of file
+    return JsonResponse({'status': 'error', 'message': 'Invalid request'}, status=400)
+
+@staff_member_required
+def view_buffer_stats(request):
+    """Queue depth and flush latency of this worker process's view buffer"""
+    return JsonResponse(view_buffer.stats())
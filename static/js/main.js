@@ -37,7 +37,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     
                     // Update like count if element exists
                     if (countElement) {
-                        countElement.textContent =  ;
+                        countElement.textContent = data.like_count;
                     }
                     
                     // Remove animation class after it completes
@@ -49,6 +49,41 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
+    // Search typeahead: suggest tags and creators as the user types
+    const searchInput = document.querySelector('input[data-suggest-url]');
+    if (searchInput) {
+        const datalist = document.getElementById(searchInput.getAttribute('list'));
+        const suggestUrl = searchInput.dataset.suggestUrl;
+        let debounceTimer = null;
+        let lastQuery = '';
+        
+        searchInput.addEventListener('input', function() {
+            clearTimeout(debounceTimer);
+            debounceTimer = setTimeout(() => {
+                const query = searchInput.value.trim();
+                if (query.length < 2 || query === lastQuery) {
+                    return;
+                }
+                lastQuery = query;
+                
+                fetch(`${suggestUrl}?q=${encodeURIComponent(query)}`)
+                .then(response => response.json())
+                .then(data => {
+                    // Ignore responses that arrive after the user kept typing
+                    if (query !== searchInput.value.trim()) {
+                        return;
+                    }
+                    datalist.innerHTML = '';
+                    data.tags.concat(data.creators).forEach(value => {
+                        const option = document.createElement('option');
+                        option.value = value;
+                        datalist.appendChild(option);
+                    });
+                });
+            }, 150);
+        });
+    }
+    
     // Auto-size textareas
     document.querySelectorAll('textarea').forEach(textarea => {
         textarea.addEventListener('input', function() {
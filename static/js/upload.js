@@ -0,0 +1,131 @@
+// Chunked, resumable video upload: the file is sent in fixed-size slices so
+// neither the browser nor the server ever holds it whole, and an interrupted
+// upload picks up from the last byte the server acknowledged.
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.querySelector('form[data-chunked-upload-url]');
+    if (!form || !window.fetch || !window.Blob || !Blob.prototype.slice) {
+        return;  // plain multipart form submission still works
+    }
+
+    const fileInput = form.querySelector('input[type="file"][name="video_file"]');
+    const progress = document.getElementById('upload-progress');
+    const progressBar = progress ? progress.querySelector('.progress-bar') : null;
+    const submitButton = form.querySelector('button[type="submit"]');
+    const csrfToken = form.querySelector('input[name="csrfmiddlewaretoken"]').value;
+    const MAX_RETRIES = 5;
+
+    function fileKey(file) {
+        return 'upload:' + [file.name, file.size, file.lastModified].join(':');
+    }
+
+    function showProgress(sent, total) {
+        if (!progress) return;
+        const percent = Math.floor((sent / total) * 100);
+        progress.classList.remove('d-none');
+        progressBar.style.width = percent + '%';
+        progressBar.textContent = percent + '%';
+    }
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
+    async function request(url, options) {
+        options.headers = Object.assign({
+            'X-CSRFToken': csrfToken,
+            'X-Requested-With': 'XMLHttpRequest'
+        }, options.headers || {});
+        const response = await fetch(url, options);
+        const data = await response.json().catch(() => ({}));
+        return { response, data };
+    }
+
+    async function startOrResume(file) {
+        // Reuse the session from an earlier, interrupted attempt at the same file
+        const saved = JSON.parse(localStorage.getItem(fileKey(file)) || 'null');
+        if (saved) {
+            const { response, data } = await request(saved.upload_url, { method: 'GET' });
+            if (response.ok && data.state === 'active') {
+                saved.offset = data.offset;
+                return saved;
+            }
+            localStorage.removeItem(fileKey(file));
+        }
+
+        const body = new FormData();
+        body.append('filename', file.name);
+        body.append('size', file.size);
+        body.append('content_type', file.type);
+        const { response, data } = await request(form.dataset.chunkedUploadUrl, { method: 'POST', body });
+        if (!response.ok) {
+            throw new Error(data.message || 'Could not start the upload.');
+        }
+        localStorage.setItem(fileKey(file), JSON.stringify(data));
+        return data;
+    }
+
+    async function sendChunks(file, session) {
+        let offset = session.offset;
+        let retries = 0;
+        while (offset < file.size) {
+            const end = Math.min(offset + session.chunk_size, file.size);
+            try {
+                const { response, data } = await request(session.upload_url, {
+                    method: 'PUT',
+                    headers: { 'Content-Range': `bytes ${offset}-${end - 1}/${file.size}` },
+                    body: file.slice(offset, end)
+                });
+                if (response.status === 409 && data.offset === offset) {
+                    throw new Error(data.message || 'Upload session is no longer active.');
+                }
+                if (response.ok || response.status === 409) {
+                    // 409 means the server is elsewhere; continue from its offset
+                    offset = data.offset;
+                    retries = 0;
+                    showProgress(offset, file.size);
+                    continue;
+                }
+                if (response.status < 500) {
+                    throw new Error(data.message || 'Upload rejected.');
+                }
+            } catch (error) {
+                if (!(error instanceof TypeError)) throw error;  // only retry network failures
+            }
+            if (++retries > MAX_RETRIES) {
+                throw new Error('Upload interrupted. Submit again to resume.');
+            }
+            await sleep(1000 * 2 ** retries);
+            const { data } = await request(session.upload_url, { method: 'GET' });
+            if (typeof data.offset === 'number') offset = data.offset;
+        }
+    }
+
+    async function complete(file, session) {
+        const body = new FormData(form);
+        body.delete('video_file');
+        const { response, data } = await request(session.complete_url, { method: 'POST', body });
+        if (!response.ok) {
+            const errors = data.errors ? Object.values(data.errors).flat().join(' ') : '';
+            throw new Error([data.message, errors].filter(Boolean).join(': ') || 'Could not finish the upload.');
+        }
+        localStorage.removeItem(fileKey(file));
+        window.location.href = data.redirect;
+    }
+
+    form.addEventListener('submit', async function(e) {
+        const file = fileInput && fileInput.files[0];
+        if (!file) return;
+        e.preventDefault();
+
+        submitButton.disabled = true;
+        try {
+            const session = await startOrResume(file);
+            showProgress(session.offset, file.size);
+            await sendChunks(file, session);
+            await complete(file, session);
+        } catch (error) {
+            alert(error.message);
+            submitButton.disabled = false;
+        }
+    });
+});
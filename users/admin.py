@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from .jobs import close_account
 from .models import CustomUser
 from .forms import CustomUserCreationForm, CustomUserChangeForm
 
@@ -25,4 +26,17 @@ class CustomUserAdmin(UserAdmin):
     search_fields = ('username', 'email')
     ordering = ('username',)
 
+    def delete_model(self, request, obj):
+        close_account(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            close_account(user)
+
+    def get_deleted_objects(self, objs, request):
+        # Dependents are removed later by the reaper; collecting them for the
+        # confirmation page would load every video, like and comment
+        perms_needed = set() if self.has_delete_permission(request) else {CustomUser._meta.verbose_name}
+        return [str(obj) for obj in objs], {CustomUser._meta.verbose_name_plural: len(objs)}, perms_needed, []
+
 admin.site.register(CustomUser, CustomUserAdmin)
@@ -0,0 +1,122 @@
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import CustomUser
+
+# Per-user follow sets and counts, cached where every process sees the
+# same entries, so profile headers and fan-out skip the aggregates. Writes
+# through the followers relation drop the affected entries; the TTL bounds
+# staleness from writes that bypass it (the account reaper's batched deletes)
+FOLLOW_GRAPH_CACHE_ALIAS = 'shared'
+FOLLOW_GRAPH_TTL = getattr(settings, 'FOLLOW_GRAPH_TTL', 10 * 60)
+
+Follow = CustomUser.followers.through
+
+
+class FollowSet:
+    """A sorted array of user IDs with O(log n) membership tests."""
+
+    __slots__ = ('ids',)
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __contains__(self, user_id):
+        position = bisect_left(self.ids, user_id)
+        return position < len(self.ids) and self.ids[position] == user_id
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _key(kind, user_id):
+    return f'follow:{kind}:{user_id}'
+
+
+def _id_set(kind, user_id, column, owner):
+    # Cached as the array's raw bytes: 8 bytes per edge, however many
+    key = _key(kind, user_id)
+    cache = caches[FOLLOW_GRAPH_CACHE_ALIAS]
+    data = cache.get(key)
+    ids = array('q')
+    if data is None:
+        ids.extend(sorted(Follow.objects.filter(**{owner: user_id}).values_list(column, flat=True)))
+        cache.set(key, ids.tobytes(), FOLLOW_GRAPH_TTL)
+    else:
+        ids.frombytes(data)
+    return FollowSet(ids)
+
+
+def followers_of(user_id):
+    """IDs of the users following ``user_id``."""
+    return _id_set('followers', user_id, 'to_customuser_id', 'from_customuser_id')
+
+
+def following_of(user_id):
+    """IDs of the users ``user_id`` follows."""
+    return _id_set('following', user_id, 'from_customuser_id', 'to_customuser_id')
+
+
+def follows(follower_id, user_id):
+    """
+    Whether ``follower_id`` follows ``user_id``, asked of the database: a
+    single probe of the followers table's unique index. Access checks and
+    the follow toggle must not act on a cached set another process has
+    not invalidated yet.
+    """
+    if follower_id is None:
+        return False
+    return Follow.objects.filter(from_customuser_id=user_id, to_customuser_id=follower_id).exists()
+
+
+def follow_counts(user_id):
+    """``(followers, following)`` for a profile header."""
+    key = _key('counts', user_id)
+    cache = caches[FOLLOW_GRAPH_CACHE_ALIAS]
+    counts = cache.get(key)
+    if counts is None:
+        def edges(owner):
+            rows = (
+                Follow.objects.filter(**{owner: OuterRef('pk')})
+                .order_by()
+                .values(owner)
+                .annotate(total=Count('pk'))
+                .values('total')
+            )
+            return Coalesce(Subquery(rows), 0)
+
+        row = (
+            CustomUser.objects.filter(pk=user_id)
+            .annotate(follower_total=edges('from_customuser'), following_total=edges('to_customuser'))
+            .values_list('follower_total', 'following_total')
+            .first()
+        )
+        counts = tuple(row or (0, 0))
+        cache.set(key, counts, FOLLOW_GRAPH_TTL)
+    return counts
+
+
+def invalidate(followed_ids=(), follower_ids=()):
+    """
+    Drop the cached entries an edge change between these users touches,
+    once the surrounding transaction commits, so a rebuild cannot read the
+    graph from before the change.
+    """
+    keys = [_key(kind, user_id) for user_id in followed_ids for kind in ('followers', 'counts')]
+    keys += [_key(kind, user_id) for user_id in follower_ids for kind in ('following', 'counts')]
+    if keys:
+        transaction.on_commit(lambda: caches[FOLLOW_GRAPH_CACHE_ALIAS].delete_many(keys))
+
+
+def forget(user_id):
+    """Drop every entry that mentions ``user_id``, before its edges are removed wholesale."""
+    followers, following = list(followers_of(user_id)), list(following_of(user_id))
+    invalidate(followed_ids=[user_id, *following], follower_ids=[user_id, *followers])
@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.utils import timezone
+from core.deletion import REAP_BATCH_SIZE, reap_related
+from core.images import AVATAR_WIDTHS, RENDITION_FORMATS, make_renditions, needs_renditions
+from core.jobs import enqueue, register
+from interactions.models import Comment, Like
+from videos.jobs import soft_delete
+from videos.models import Video, count_subquery
+from . import follow_graph
+from .models import CustomUser
+
+AVATAR_RENDITIONS = 'users.avatar_renditions'
+REAP_USER = 'users.reap'
+
+# How long users.reap waits for the account's videos to be reaped before checking again
+REAP_VIDEOS_WAIT = 60
+
+
+@register(AVATAR_RENDITIONS)
+def avatar_renditions(payload):
+    """Resize the user's current profile picture for srcset; a no-op if that was already done."""
+    user = CustomUser.objects.filter(pk=payload['user_id']).first()
+    if user is not None and needs_renditions(user, 'profile_pic'):
+        make_renditions(user, 'profile_pic', AVATAR_WIDTHS)
+
+
+def close_account(user):
+    """
+    Deactivate an account and hide it and its videos at once; the
+    users.reap and videos.reap jobs remove the rest in the background.
+    """
+    with transaction.atomic():
+        CustomUser.objects.filter(pk=user.pk).update(is_active=False, deleted_at=timezone.now())
+        soft_delete(Video.objects.filter(user=user))
+        enqueue(REAP_USER, {'user_id': user.pk})
+
+
+@register(REAP_USER, timeout=60 * 60)
+def reap(payload):
+    """
+    Finish deleting a closed account once videos.reap has removed its
+    videos: likes and comments go in batches with the counters of the
+    videos they were on recomputed, views are kept but anonymized, then
+    follows, the profile picture and finally the row itself.
+    """
+    user = CustomUser.objects.filter(pk=payload['user_id'], deleted_at__isnull=False).first()
+    if user is None:
+        return
+    if Video.all_objects.filter(user=user).exists():
+        enqueue(REAP_USER, payload, delay=REAP_VIDEOS_WAIT)
+        return
+
+    delete_engagement(Like.objects.filter(user=user))
+    delete_engagement(Comment.objects.filter(user=user))
+    # The batched deletes below bypass the m2m signals
+    follow_graph.forget(user.pk)
+    reap_related(user)
+
+    storage = user.profile_pic.storage
+    names = [user.profile_pic.name] if user.profile_pic else []
+    names += [name for fmt in RENDITION_FORMATS for _, name in user.profile_pic_renditions.get(fmt, [])]
+    for name in names:
+        storage.delete(name)
+
+    CustomUser.objects.filter(pk=user.pk).delete()
+
+
+def delete_engagement(queryset, batch_size=REAP_BATCH_SIZE):
+    """
+    Delete likes or comments a batch at a time, recounting the engagement
+    counters of the videos each batch touched. Deleted comments take their
+    replies with them, so the counters are recounted rather than decremented.
+    """
+    model = queryset.model
+    while True:
+        rows = list(queryset.order_by('pk').values_list('pk', 'video_id')[:batch_size])
+        if not rows:
+            return
+        with transaction.atomic():
+            model.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+            Video.all_objects.filter(pk__in={video_id for _, video_id in rows}).update(
+                like_count=count_subquery(Like, is_like=True),
+                dislike_count=count_subquery(Like, is_like=False),
+                comment_count=count_subquery(Comment),
+            )
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:08
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_alter_customuser_profile_pic'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AlterField(
+            model_name='customuser',
+            name='profile_pic',
+            field=models.ImageField(blank=True, null=True, upload_to=users.models.profile_pic_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='user_type',
+            field=models.CharField(choices=[('consumer', 'Consumer'), ('creator', 'Creator'), ('admin', 'Admin')], db_index=True, default='consumer', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['username'], name='user_username_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
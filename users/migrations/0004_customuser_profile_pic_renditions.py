@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_customuser_username_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='profile_pic_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -21,11 +22,23 @@ class CustomUser(AbstractUser):
         db_index=True  # Adding an index for faster query performance
     )
     profile_pic = models.ImageField(upload_to=profile_pic_upload_path, blank=True, null=True)
+    # Resized WebP/JPEG copies of the profile picture, made by core.images
+    profile_pic_renditions = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(blank=True)
     followers = models.ManyToManyField('self', symmetrical=False, blank=True, related_name='following')
     website = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the account is closed: it is deactivated and hidden at once,
+    # and the users.reap job removes its rows and files in batches
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        swappable = 'AUTH_USER_MODEL'
+        indexes = [
+            # Serves the search typeahead's prefix and similarity lookups
+            GinIndex(fields=['username'], opclasses=['gin_trgm_ops'], name='user_username_trgm'),
+        ]
 
     def __str__(self):
         return self.username
@@ -36,8 +49,10 @@ class CustomUser(AbstractUser):
 
     @property
     def follower_count(self):
-        return self.followers.count()
+        from .follow_graph import follow_counts
+        return follow_counts(self.pk)[0]
 
     @property
     def following_count(self):
-        return self.following.count()
+        from .follow_graph import follow_counts
+        return follow_counts(self.pk)[1]
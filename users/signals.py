@@ -0,0 +1,36 @@
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from core.images import needs_renditions
+from core.jobs import enqueue
+from . import follow_graph
+from .jobs import AVATAR_RENDITIONS
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+def queue_avatar_renditions(sender, instance, update_fields=None, **kwargs):
+    """Resize new or replaced profile pictures in the background."""
+    if update_fields is not None and 'profile_pic' not in update_fields:
+        return
+    if needs_renditions(instance, 'profile_pic'):
+        enqueue(AVATAR_RENDITIONS, {'user_id': instance.pk})
+
+
+@receiver(m2m_changed, sender=CustomUser.followers.through)
+def invalidate_follow_graph(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop the cached follow sets and counts of both ends of every changed edge."""
+    if action == 'pre_clear':
+        # Clearing does not report which users were on the other end
+        instance._cleared_follow_pks = list(
+            follow_graph.following_of(instance.pk) if reverse else follow_graph.followers_of(instance.pk)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    others = instance.__dict__.pop('_cleared_follow_pks', []) if action == 'post_clear' else pk_set
+    if reverse:
+        # instance.following changed: instance is the follower
+        follow_graph.invalidate(followed_ids=others, follower_ids=[instance.pk])
+    else:
+        follow_graph.invalidate(followed_ids=[instance.pk], follower_ids=others)
@@ -1,3 +1,30 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from videos.models import Video
+from . import follow_graph
+from .models import CustomUser
+
+
+class FollowToggleTests(TestCase):
+    """Following and access checks must not trust a follow set cached before the last change."""
+
+    def test_toggle_and_access_follow_the_database(self):
+        creator = CustomUser.objects.create_user(username='creator', password='testpass123')
+        fan = CustomUser.objects.create_user(username='fan', password='testpass123')
+        video = Video.objects.create(user=creator, title='Clip', video_file='videos/sample.mp4', visibility='followers')
+        watch = reverse('videos:watch', args=[video.pk])
+        follow = reverse('users:follow_user', args=[creator.username])
+        self.client.force_login(fan)
+
+        # Cached now and, as in a process that missed the invalidation, never dropped:
+        # on_commit callbacks do not run inside a TestCase
+        self.assertNotIn(creator.pk, follow_graph.following_of(fan.pk))
+
+        self.client.post(follow)
+        self.assertTrue(creator.followers.filter(pk=fan.pk).exists())
+        self.assertEqual(self.client.get(watch).status_code, 200)
+
+        self.client.post(follow)
+        self.assertFalse(creator.followers.filter(pk=fan.pk).exists())
+        self.assertEqual(self.client.get(watch).status_code, 302)
@@ -9,5 +9,6 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('edit-profile/', views.edit_profile, name='edit_profile'),
+    path('delete-account/', views.delete_account, name='delete_account'),
     path('follow/<str:username>/', views.follow_user, name='follow_user'),
 ]
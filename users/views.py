@@ -2,9 +2,13 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from .follow_graph import follows
 from .forms import CustomUserChangeForm, SignUpForm
+from .jobs import close_account
 from .models import CustomUser
 from videos.models import Video
+from core.pagination import KeysetPaginator
+from core.storage import prefetch_urls
 
 def signup(request):
     if request.method == 'POST':
@@ -38,13 +42,17 @@ def logout_view(request):
     return redirect('core:home')
 
 def profile(request, username):
-    user = get_object_or_404(CustomUser, username=username)
-    videos = Video.objects.filter(user=user, visibility='public').order_by('-created_at')
-    is_following = request.user.is_authenticated and request.user.following.filter(id=user.id).exists()
+    user = get_object_or_404(CustomUser, username=username, deleted_at__isnull=True)
+    videos = Video.objects.filter(user=user).visible_to(request.user).with_card_data()
+    page_obj = KeysetPaginator(videos, 12).get_page(request.GET.get('cursor'))
+    prefetch_urls([user, *page_obj], 'profile_pic', 'thumbnail', 'video_file')
+    is_following = follows(request.user.pk, user.pk)
     
     context = {
         'profile_user': user,
-        'videos': videos,
+        'videos': page_obj,
+        'page_obj': page_obj,
+        'video_count': videos.count(),
         'is_following': is_following,
     }
     return render(request, 'users/profile.html', context)
@@ -61,13 +69,26 @@ def edit_profile(request):
         form = CustomUserChangeForm(instance=request.user)
     return render(request, 'users/edit_profile.html', {'form': form})
 
+@login_required
+def delete_account(request):
+    """
+    Close the logged-in user's account. It disappears at once; its videos,
+    comments and likes are removed in the background.
+    """
+    if request.method == 'POST':
+        close_account(request.user)
+        logout(request)
+        messages.success(request, 'Your account has been deleted.')
+        return redirect('core:home')
+    return render(request, 'users/delete_account.html')
+
 @login_required
 def follow_user(request, username):
-    user_to_follow = get_object_or_404(CustomUser, username=username)
+    user_to_follow = get_object_or_404(CustomUser, username=username, deleted_at__isnull=True)
     if request.user == user_to_follow:
         messages.error(request, 'You cannot follow yourself.')
     else:
-        if request.user.following.filter(id=user_to_follow.id).exists():
+        if follows(request.user.pk, user_to_follow.pk):
             request.user.following.remove(user_to_follow)
             messages.success(request, f'You have unfollowed {username}.')
         else:
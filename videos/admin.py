@@ -1,12 +1,17 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.utils import timezone
+from interactions.uniques import unique_viewers
+from .jobs import soft_delete
 from .models import Video, Tag
 
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
-    list_display = ('title', 'user', 'visibility', 'created_at', 'like_count', 'comment_count')
+    list_display = ('title', 'user', 'visibility', 'created_at', 'view_count', 'like_count', 'comment_count')
     list_filter = ('visibility', 'created_at', 'tags')
     search_fields = ('title', 'description', 'user__username')
-    readonly_fields = ('id', 'created_at', 'updated_at', 'like_count', 'comment_count')
+    readonly_fields = ('id', 'created_at', 'updated_at', 'duration', 'width', 'height', 'bitrate', 'video_codec', 'audio_codec', 'processed_at', 'view_count', 'unique_viewers_30d', 'like_count', 'dislike_count', 'comment_count')
     filter_horizontal = ('tags',)
     fieldsets = (
         ('Basic Information', {
@@ -18,26 +23,37 @@ class VideoAdmin(admin.ModelAdmin):
         ('Visibility & Metadata', {
             'fields': ('visibility', 'tags', 'created_at', 'updated_at')
         }),
+        ('Media (Read-only)', {
+            'fields': ('duration', 'width', 'height', 'bitrate', 'video_codec', 'audio_codec', 'processed_at'),
+            'classes': ('collapse',)
+        }),
         ('Counts (Read-only)', {
-            'fields': ('like_count', 'comment_count'),
+            'fields': ('view_count', 'unique_viewers_30d', 'like_count', 'dislike_count', 'comment_count'),
             'classes': ('collapse',)
         }),
     )
 
-    def like_count(self, obj):
-        return obj.like_count
-    like_count.short_description = 'Likes'
+    def delete_model(self, request, obj):
+        soft_delete(Video.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        soft_delete(queryset)
+
+    def get_deleted_objects(self, objs, request):
+        # Dependents are removed later by the reaper; collecting them for the
+        # confirmation page would load every like, comment and view
+        perms_needed = set() if self.has_delete_permission(request) else {Video._meta.verbose_name}
+        return [str(obj) for obj in objs], {Video._meta.verbose_name_plural: len(objs)}, perms_needed, []
 
-    def comment_count(self, obj):
-        return obj.comment_count
-    comment_count.short_description = 'Comments'
+    def unique_viewers_30d(self, obj):
+        if obj.pk is None:
+            return 0
+        return unique_viewers(obj, since=timezone.localdate() - timedelta(days=29))
+    unique_viewers_30d.short_description = 'Unique viewers (30 days, approx.)'
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'video_count')
     search_fields = ('name', 'slug')
-    readonly_fields = ('slug',)
-    
-    def video_count(self, obj):
-        return obj.videos.count()
-    video_count.short_description = 'Number of Videos'
\ No newline at end of file
+    readonly_fields = ('slug', 'video_count')
+    ordering = ('-video_count', 'name')
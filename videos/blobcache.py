@@ -0,0 +1,260 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from storages.backends.azure_storage import AzureStorage
+from core.storage import download_to
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-flight stays per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Optional: when enabled, the watch page plays the original file through
+# videos:stream, which serves byte ranges from a local disk copy of hot
+# blobs instead of sending every player to the storage account
+VIDEO_BLOB_CACHE_ENABLED = getattr(settings, 'VIDEO_BLOB_CACHE_ENABLED', False)
+VIDEO_BLOB_CACHE_DIR = getattr(settings, 'VIDEO_BLOB_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'clipclap-blobcache'))
+VIDEO_BLOB_CACHE_MAX_BYTES = getattr(settings, 'VIDEO_BLOB_CACHE_MAX_BYTES', 10 * 1024 ** 3)
+# Blobs larger than this would evict too much of the cache; they are
+# streamed straight from storage instead
+VIDEO_BLOB_CACHE_MAX_FILE_BYTES = getattr(settings, 'VIDEO_BLOB_CACHE_MAX_FILE_BYTES', 1024 ** 3)
+
+# Pieces read from disk per write to the client
+STREAM_CHUNK_SIZE = 256 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    The inclusive ``(start, end)`` byte range a ``Range`` header asks for,
+    or None to send the whole file. Multi-range requests are answered with
+    the whole file, which RFC 9110 allows.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+
+def read_file(handle, start, length, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield ``length`` bytes of an open file from ``start``, closing it when done."""
+    with handle:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(chunk_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def read_storage(storage, name, start, length, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield ``length`` bytes of a stored file from ``start``, fetching only that range where the backend allows."""
+    if isinstance(storage, AzureStorage):
+        blob = storage.client.get_blob_client(storage._get_valid_path(name))
+        yield from blob.download_blob(offset=start, length=length).chunks()
+        return
+    with storage.open(name, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(chunk_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+class BlobCache:
+    """
+    Size-bounded LRU of whole blobs on local disk, shared by every process
+    on the host. Recency is the file's mtime, touched on each hit, so
+    eviction order holds across processes. Misses are read-through and
+    single-flight: one caller downloads the blob while concurrent callers
+    for the same blob, in any process, wait on its lock file and then read
+    the finished copy.
+    """
+
+    def __init__(self, location, max_bytes):
+        self.location = location
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._fill_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.coalesced = 0
+        self.fills = 0
+        self.failed_fills = 0
+        self.fill_bytes = 0
+        self.fill_seconds = 0.0
+        self.evictions = 0
+
+    def path_for(self, name):
+        return os.path.join(self.location, hashlib.sha256(name.encode()).hexdigest())
+
+    def open(self, storage, name):
+        """
+        ``(size, file)`` for a stored file: ``file`` is an open handle on
+        the local copy, or None for files too large to cache, which callers
+        read from storage. Holding the handle keeps the data readable even
+        if the copy is evicted meanwhile.
+        """
+        path = self.path_for(name)
+        handle = self._open(path)
+        if handle is not None:
+            with self._lock:
+                self.hits += 1
+            return os.fstat(handle.fileno()).st_size, handle
+
+        size = storage.size(name)
+        if size > VIDEO_BLOB_CACHE_MAX_FILE_BYTES:
+            with self._lock:
+                self.bypassed += 1
+            return size, None
+        with self._lock:
+            self.misses += 1
+        handle = self._fill_once(storage, name, path)
+        self.evict()
+        return os.fstat(handle.fileno()).st_size, handle
+
+    def _fill_once(self, storage, name, path):
+        os.makedirs(self.location, exist_ok=True)
+        # Threads of this process queue on a per-blob lock, other processes
+        # on the lock file beside the blob
+        with self._lock:
+            fill_lock = self._fill_locks.setdefault(path, threading.Lock())
+        try:
+            with fill_lock, open(path + '.lock', 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    handle = self._open(path)
+                    if handle is not None:
+                        # Another caller filled it while this one waited
+                        with self._lock:
+                            self.coalesced += 1
+                        return handle
+                    self._fill(storage, name, path)
+                    return self._open(path)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            with self._lock:
+                self._fill_locks.pop(path, None)
+
+    def _open(self, path):
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        # Bump recency for eviction
+        os.utime(handle.fileno())
+        return handle
+
+    def _fill(self, storage, name, path):
+        part = f'{path}.part.{os.getpid()}.{threading.get_ident()}'
+        start = time.monotonic()
+        try:
+            with open(part, 'wb') as handle:
+                download_to(storage, name, handle)
+            size = os.path.getsize(part)
+            # Readers only ever see a complete file
+            os.replace(part, path)
+        except BaseException:
+            logger.warning('Filling the blob cache with %s failed', name, exc_info=True)
+            with self._lock:
+                self.failed_fills += 1
+            try:
+                os.remove(part)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self.fills += 1
+            self.fill_bytes += size
+            self.fill_seconds += time.monotonic() - start
+
+    def _entries(self):
+        # Only finished blobs; part files and the (empty) lock files are
+        # left alone, since deleting a lock file could let two fills race
+        entries = []
+        try:
+            with os.scandir(self.location) as scan:
+                for entry in scan:
+                    if entry.is_file() and '.' not in entry.name:
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def evict(self):
+        """Delete least recently used blobs until the cache fits its budget."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                # A reader that already opened the file keeps its data until it closes it
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters for this process plus the cache's current disk usage."""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'pid': os.getpid(),
+                'enabled': VIDEO_BLOB_CACHE_ENABLED,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_ratio': self.hits / lookups if lookups else None,
+                'coalesced': self.coalesced,
+                'fills': self.fills,
+                'failed_fills': self.failed_fills,
+                'fill_bytes': self.fill_bytes,
+                'fill_mb_per_second': self.fill_bytes / 1024 ** 2 / self.fill_seconds if self.fill_seconds else None,
+                'evictions': self.evictions,
+                'blobs': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+            }
+
+
+blob_cache = BlobCache(VIDEO_BLOB_CACHE_DIR, VIDEO_BLOB_CACHE_MAX_BYTES)
@@ -1,7 +1,7 @@
 from django import forms
-from .models import Video, Tag
+from .models import Video
 import os
-from django.utils.text import slugify
+from .tags import resolve_tags
 class VideoUploadForm(forms.ModelForm):
     tags = forms.CharField(
         required=False,
@@ -54,13 +54,14 @@ class VideoUploadForm(forms.ModelForm):
         if len(tag_list) > 10:
             raise forms.ValidationError('Maximum 10 tags allowed.')
         
-        # Get or create tags
-        tag_objects = []
-        for tag_name in tag_list:
-            tag, created = Tag.objects.get_or_create(
-                name=tag_name,
-                defaults={'slug': slugify(tag_name)}
-            )
-            tag_objects.append(tag)
-        
-        return tag_objects
+        if any(len(tag) > 50 for tag in tag_list):
+            raise forms.ValidationError('Tags can be at most 50 characters long.')
+
+        return resolve_tags(tag_list)
+
+
+class VideoDetailsForm(VideoUploadForm):
+    """Metadata for a video whose file arrived through a chunked upload session."""
+
+    class Meta(VideoUploadForm.Meta):
+        fields = ['thumbnail', 'title', 'description', 'visibility']
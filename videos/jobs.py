@@ -0,0 +1,152 @@
+import os
+import tempfile
+import uuid
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from core.deletion import reap_related
+from core.images import RENDITION_FORMATS, THUMBNAIL_WIDTHS, make_renditions, needs_renditions
+from core.jobs import enqueue, enqueue_many, register
+from .media import extract_frame, local_copy, probe, transcode_hls
+from .models import Video
+from .subscriptions import fan_out
+
+PROCESS_UPLOAD = 'videos.process_upload'
+TRANSCODE_HLS = 'videos.transcode_hls'
+THUMBNAIL_RENDITIONS = 'videos.thumbnail_renditions'
+REAP_VIDEO = 'videos.reap'
+FAN_OUT = 'videos.fan_out'
+
+HLS_CONTENT_TYPES = {'.m3u8': 'application/vnd.apple.mpegurl', '.ts': 'video/mp2t'}
+
+
+@register(PROCESS_UPLOAD, timeout=30 * 60)
+def process_upload(payload):
+    """Probe a newly uploaded video and give it a thumbnail if it has none."""
+    video = Video.objects.filter(pk=payload['video_id']).first()
+    if video is None:
+        return  # deleted before the job ran
+
+    with local_copy(video.video_file) as path:
+        metadata = probe(path)
+        if not video.thumbnail:
+            with tempfile.TemporaryDirectory() as scratch:
+                frame = os.path.join(scratch, 'thumbnail.jpg')
+                # A second in skips black lead-in frames; very short clips use their midpoint
+                extract_frame(path, frame, at=min(1.0, (metadata['duration'] or 0) / 2))
+                with open(frame, 'rb') as image:
+                    video.thumbnail.save(f'{video.pk}.jpg', File(image), save=False)
+
+    for field, value in metadata.items():
+        setattr(video, field, value)
+    video.processed_at = timezone.now()
+    video.save(update_fields=[*metadata, 'thumbnail', 'processed_at'])
+    # Encoding needs the probed dimensions, so it is chained rather than queued at upload
+    enqueue(TRANSCODE_HLS, {'video_id': str(video.pk)})
+
+
+@register(TRANSCODE_HLS, timeout=3 * 60 * 60, max_attempts=2)
+def transcode(payload):
+    """
+    Encode the HLS ladder and store it beside the original under a fresh
+    directory, so a re-run never overwrites segments that players may be
+    streaming; the previous ladder is removed once the video points at the new one.
+    """
+    video = Video.objects.filter(pk=payload['video_id']).first()
+    if video is None:
+        return
+
+    storage = video.video_file.storage
+    prefix = f'{os.path.splitext(video.video_file.name)[0]}_hls/{uuid.uuid4().hex[:12]}/'
+    with local_copy(video.video_file) as path, tempfile.TemporaryDirectory() as out_dir:
+        renditions, files = transcode_hls(path, out_dir, video.width, video.height, has_audio=bool(video.audio_codec))
+        for filename in files:
+            with open(os.path.join(out_dir, filename), 'rb') as handle:
+                content = File(handle, name=filename)
+                content.content_type = HLS_CONTENT_TYPES.get(os.path.splitext(filename)[1])
+                # The directory is new, so storage keeps the names the playlists refer to
+                storage.save(prefix + filename, content)
+
+    previous = video.hls_playlist
+    video.hls_playlist = prefix + 'master.m3u8'
+    video.renditions = renditions
+    video.save(update_fields=['hls_playlist', 'renditions'])
+    if previous:
+        delete_hls(storage, previous)
+
+
+def delete_hls(storage, playlist):
+    """Remove every file of the ladder whose master playlist is ``playlist``."""
+    directory = os.path.dirname(playlist)
+    try:
+        _, files = storage.listdir(directory)
+    except (NotImplementedError, FileNotFoundError):
+        return
+    for filename in files:
+        storage.delete(f'{directory}/{filename}')
+
+
+@register(THUMBNAIL_RENDITIONS)
+def thumbnail_renditions(payload):
+    """Resize the video's current thumbnail for srcset; a no-op if that was already done."""
+    video = Video.objects.filter(pk=payload['video_id']).first()
+    if video is not None and needs_renditions(video, 'thumbnail'):
+        make_renditions(video, 'thumbnail', THUMBNAIL_WIDTHS)
+
+
+@register(FAN_OUT, timeout=30 * 60)
+def fan_out_upload(payload):
+    """Deliver a new upload to its creator's followers' subscription feeds."""
+    video = Video.objects.filter(pk=payload['video_id']).first()
+    if video is not None:
+        fan_out(video)
+
+
+def enqueue_processing(video):
+    return enqueue(PROCESS_UPLOAD, {'video_id': str(video.pk)})
+
+
+def enqueue_fan_out(video):
+    return enqueue(FAN_OUT, {'video_id': str(video.pk)})
+
+
+def soft_delete(videos):
+    """
+    Hide a queryset of videos from every page at once and queue a
+    videos.reap job per video to remove the rest; returns how many were
+    hidden. Cheap enough to call in a request.
+    """
+    with transaction.atomic():
+        pks = list(videos.filter(deleted_at__isnull=True).values_list('pk', flat=True))
+        Video.all_objects.filter(pk__in=pks).update(deleted_at=timezone.now())
+        enqueue_many(REAP_VIDEO, ({'video_id': str(pk)} for pk in pks))
+    return len(pks)
+
+
+@register(REAP_VIDEO, timeout=60 * 60)
+def reap(payload):
+    """
+    Finish deleting a soft-deleted video: its likes, comments, views and
+    other dependents go in short batched transactions, then its files, then
+    the row itself. Safe to re-run after a crash part way through.
+    """
+    video = Video.all_objects.filter(pk=payload['video_id'], deleted_at__isnull=False).first()
+    if video is None:
+        return
+    # Through the related manager, so the m2m signals settle Tag.video_count
+    video.tags.clear()
+    reap_related(video)
+
+    storage = video.video_file.storage
+    if video.hls_playlist:
+        delete_hls(storage, video.hls_playlist)
+    names = [video.video_file.name]
+    if video.thumbnail:
+        names.append(video.thumbnail.name)
+    # Every recorded rendition, including ones made from a replaced thumbnail
+    names += [name for fmt in RENDITION_FORMATS for _, name in video.thumbnail_renditions.get(fmt, [])]
+    for name in names:
+        storage.delete(name)
+
+    Video.all_objects.filter(pk=video.pk).delete()
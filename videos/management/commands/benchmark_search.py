@@ -0,0 +1,126 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from videos.models import Video, Tag
+
+User = get_user_model()
+
+WORDS = (
+    'music dance funny tutorial gaming food travel fitness art fashion cooking guitar piano '
+    'drums comedy prank vlog review unboxing makeup skincare workout yoga running cycling '
+    'football basketball soccer tennis golf coding python django react design drawing painting '
+    'photography camera drone nature ocean mountain city night street festival concert party '
+    'wedding baby puppy kitten garden recipe baking coffee pizza sushi burger vegan healthy'
+).split()
+
+DEFAULT_QUERIES = ['music', 'guitar tutorial', 'funny puppy', 'street food night', 'zzzznomatch']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the legacy icontains search against the full-text search. '
+        'Seeds synthetic videos up to --videos first; run it against a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--videos', type=int, default=1_000_000, help='Minimum number of videos to benchmark against')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert while seeding')
+        parser.add_argument('--page-size', type=int, default=12, help='Results fetched per search page')
+        parser.add_argument('queries', nargs='*', help='Search terms to time (defaults to a built-in mix)')
+
+    def handle(self, *args, **options):
+        self.seed(options['videos'], options['batch_size'])
+        page_size = options['page_size']
+
+        def legacy(query):
+            # The pre-full-text implementation, evaluated in full as the template did
+            return list(
+                Video.objects.filter(visibility='public').filter(
+                    Q(title__icontains=query) |
+                    Q(description__icontains=query) |
+                    Q(user__username__icontains=query) |
+                    Q(tags__name__icontains=query)
+                ).distinct().order_by('-created_at').values_list('pk', flat=True)
+            )
+
+        def full_text(query):
+            # One results page plus the COUNT the paginator needs
+            videos = Video.objects.filter(visibility='public').search(query)
+            return list(videos.values_list('pk', flat=True)[:page_size]), videos.count()
+
+        self.stdout.write(f'{"query":<22}{"legacy p50":>12}{"legacy p95":>12}{"fts p50":>12}{"fts p95":>12}')
+        for query in options['queries'] or DEFAULT_QUERIES:
+            legacy_ms = self.time(legacy, query, options['repeat'])
+            fts_ms = self.time(full_text, query, options['repeat'])
+            self.stdout.write(
+                f'{query:<22}{self.pct(legacy_ms, 50):>10.1f}ms{self.pct(legacy_ms, 95):>10.1f}ms'
+                f'{self.pct(fts_ms, 50):>10.1f}ms{self.pct(fts_ms, 95):>10.1f}ms'
+            )
+
+    def seed(self, target, batch_size):
+        missing = target - Video.objects.count()
+        if missing <= 0:
+            return
+        self.stdout.write(f'Seeding {missing} synthetic videos...')
+        rng = random.Random(42)
+
+        tags = []
+        for word in WORDS:
+            tag, _ = Tag.objects.get_or_create(name=word)
+            tags.append(tag)
+
+        creator_count = max(1, missing // 1000)
+        existing = User.objects.filter(username__startswith='bench_').count()
+        User.objects.bulk_create(
+            User(username=f'bench_{existing + i}_{rng.choice(WORDS)}', password='!')
+            for i in range(creator_count)
+        )
+        creators = list(User.objects.filter(username__startswith='bench_').values_list('pk', flat=True))
+
+        through = Video.tags.through
+        created = 0
+        while created < missing:
+            size = min(batch_size, missing - created)
+            videos = Video.objects.bulk_create(
+                Video(
+                    user_id=rng.choice(creators),
+                    title=' '.join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+                    description=' '.join(rng.choices(WORDS, k=rng.randint(5, 30))),
+                    video_file='videos/benchmark.mp4',
+                    thumbnail='thumbnails/benchmark.jpg',
+                    visibility=rng.choice(['public', 'public', 'public', 'followers', 'private']),
+                )
+                for _ in range(size)
+            )
+            through.objects.bulk_create(
+                through(video_id=video.pk, tag_id=tag.pk)
+                for video in videos
+                for tag in rng.sample(tags, rng.randint(1, 3))
+            )
+            created += size
+            self.stdout.write(f'  {created}/{missing}')
+
+        # bulk_create skips the signals that maintain the search vector
+        call_command('rebuild_search_index', stdout=self.stdout)
+
+    @staticmethod
+    def time(func, query, repeat):
+        func(query)  # warm caches
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    @staticmethod
+    def pct(timings, percentile):
+        if len(timings) < 2:
+            return timings[0]
+        return statistics.quantiles(timings, n=100, method='inclusive')[percentile - 1]
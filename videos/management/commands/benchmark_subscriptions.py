@@ -0,0 +1,152 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from users.follow_graph import Follow
+from videos import subscriptions
+from videos.models import InboxEntry, Video
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the subscriptions feed read by fan-out on read (a join over the follow graph) '
+        'against the fan-out-on-write inboxes, and the write cost of fanning out one upload to a '
+        'creator with --followers followers. Seeds its own users and videos; run it against a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--followers', type=int, default=20_000, help='Followers of the large creator')
+        parser.add_argument('--following', type=int, default=500, help='Creators the benchmark viewer follows')
+        parser.add_argument('--videos-per-creator', type=int, default=20, help='Uploads seeded per followed creator')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per read strategy')
+        parser.add_argument('--page-size', type=int, default=12, help='Videos per feed page')
+
+    def handle(self, *args, **options):
+        viewer, large_creator = self.seed(options)
+        page_size, repeat = options['page_size'], options['repeat']
+
+        def on_read():
+            # The join this feature replaces: every upload of every followed creator
+            followed = Follow.objects.filter(to_customuser=viewer).values('from_customuser')
+            return list(
+                Video.objects.filter(user__in=followed)
+                .exclude(visibility='private')
+                .with_card_data()
+                .order_by('-created_at', '-pk')[:page_size]
+            )
+
+        def on_write():
+            return list(subscriptions.subscription_page(viewer, per_page=page_size))
+
+        rows = [
+            ('fan-out on read', self.time(on_read, repeat)),
+            ('fan-out on write', self.time(on_write, repeat)),
+        ]
+        # Hybrid: the large creator's uploads are read on demand, the rest from the inbox
+        Video.objects.filter(user=large_creator).update(fanout_on_read=True)
+        caches[subscriptions.PULLED_CREATORS_CACHE_ALIAS].delete(subscriptions.PULLED_CREATORS_CACHE_KEY)
+        try:
+            rows.append(('hybrid', self.time(on_write, repeat)))
+        finally:
+            Video.objects.filter(user=large_creator).update(fanout_on_read=False)
+            caches[subscriptions.PULLED_CREATORS_CACHE_ALIAS].delete(subscriptions.PULLED_CREATORS_CACHE_KEY)
+
+        self.stdout.write(f'Feed page of {page_size} for a viewer following {options["following"]} creators:')
+        self.stdout.write(f'{"strategy":<20}{"p50":>10}{"p95":>10}')
+        for name, timings in rows:
+            self.stdout.write(f'{name:<20}{self.pct(timings, 50):>8.2f}ms{self.pct(timings, 95):>8.2f}ms')
+
+        write_ms, reached = self.time_fan_out(large_creator, max(1, repeat // 5))
+        self.stdout.write(
+            f'Fanning one upload out to {reached} followers: p50 {self.pct(write_ms, 50):.1f}ms '
+            f'({statistics.fmean(write_ms) / max(reached, 1) * 1000:.2f}us per follower); '
+            f'fan-out on read writes nothing.'
+        )
+
+    def seed(self, options):
+        creator_names = [f'subbench_creator_{i}' for i in range(options['following'])]
+        fan_names = [f'subbench_fan_{i}' for i in range(options['followers'])]
+        existing = set(
+            User.objects.filter(username__startswith='subbench_').values_list('username', flat=True)
+        )
+        missing = [name for name in creator_names + fan_names if name not in existing]
+        if missing:
+            self.stdout.write(f'Seeding {len(missing)} users...')
+            User.objects.bulk_create((User(username=name, password='!') for name in missing), batch_size=5000)
+
+        ids = dict(User.objects.filter(username__startswith='subbench_').values_list('username', 'pk'))
+        creators = [ids[name] for name in creator_names]
+        fans = [ids[name] for name in fan_names]
+        viewer, large_creator = fans[0], creators[0]
+
+        # The viewer follows every creator; everyone follows the large one
+        edges = [Follow(from_customuser_id=creator, to_customuser_id=viewer) for creator in creators]
+        edges += [Follow(from_customuser_id=large_creator, to_customuser_id=fan) for fan in fans]
+        Follow.objects.bulk_create(edges, batch_size=5000, ignore_conflicts=True)
+
+        per_creator = options['videos_per_creator']
+        seeded = Video.objects.filter(user__in=creators).count()
+        if seeded < per_creator * len(creators):
+            self.stdout.write(f'Seeding {per_creator * len(creators) - seeded} videos...')
+            Video.objects.filter(user__in=creators).delete()
+            Video.objects.bulk_create(
+                (
+                    Video(user_id=creator, title=f'Upload {n}', video_file='videos/benchmark.mp4', thumbnail='thumbnails/benchmark.jpg')
+                    for creator in creators
+                    for n in range(per_creator)
+                ),
+                batch_size=5000,
+            )
+            # Spread the uploads over a month so feeds interleave creators
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {Video._meta.db_table} SET created_at = now() - random() * interval '30 days' "
+                    f'WHERE user_id = ANY(%s)',
+                    [creators],
+                )
+
+        # The inbox fan-out on write would have built for the viewer
+        subscriptions.backfill(((creator, viewer) for creator in creators), limit=per_creator)
+        with connection.cursor() as cursor:
+            # Fresh statistics, or the planner misjudges the bulk-loaded tables
+            for model in (User, Follow, Video, InboxEntry):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        return User.objects.get(pk=viewer), User.objects.get(pk=large_creator)
+
+    def time_fan_out(self, creator, repeat):
+        """Fan out ``repeat`` throwaway uploads by ``creator`` and clean up after each."""
+        timings, reached = [], 0
+        max_followers = subscriptions.FANOUT_MAX_FOLLOWERS
+        subscriptions.FANOUT_MAX_FOLLOWERS = float('inf')
+        try:
+            for _ in range(repeat):
+                video = Video.objects.create(user=creator, title='Fan-out probe', video_file='videos/benchmark.mp4')
+                start = time.perf_counter()
+                reached = subscriptions.fan_out(video)
+                timings.append((time.perf_counter() - start) * 1000)
+                InboxEntry.objects.filter(video=video).delete()
+                video.delete()
+        finally:
+            subscriptions.FANOUT_MAX_FOLLOWERS = max_followers
+        return timings, reached
+
+    @staticmethod
+    def time(func, repeat):
+        func()  # warm caches
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    @staticmethod
+    def pct(timings, percentile):
+        if len(timings) < 2:
+            return timings[0]
+        return statistics.quantiles(timings, n=100, method='inclusive')[percentile - 1]
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+from videos.recommendations import NEIGHBORS_PER_VIDEO, rebuild_neighbors
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the item-to-item "Recommended Videos" neighbor lists; run it nightly'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=NEIGHBORS_PER_VIDEO, help='Neighbors stored per video')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Videos scored per similarity block')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        written = rebuild_neighbors(k=options['k'], chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} neighbor rows in {elapsed:.1f}s.'))
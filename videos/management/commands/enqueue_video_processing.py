@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from core.jobs import enqueue_many
+from videos.jobs import PROCESS_UPLOAD, TRANSCODE_HLS
+from videos.models import Video
+
+
+class Command(BaseCommand):
+    help = 'Queues the probe/thumbnail job for videos that have not been processed yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Reprocess every video, not just unprocessed ones')
+        parser.add_argument('--hls', action='store_true', help='Queue HLS encoding for processed videos that have no ladder yet')
+
+    def handle(self, *args, **options):
+        if options['hls']:
+            videos = Video.objects.filter(processed_at__isnull=False, hls_playlist='')
+            queued = enqueue_many(TRANSCODE_HLS, ({'video_id': str(pk)} for pk in videos.values_list('pk', flat=True).iterator()))
+            self.stdout.write(self.style.SUCCESS(f'Queued {queued} videos for HLS encoding.'))
+            return
+
+        videos = Video.objects.all() if options['all'] else Video.objects.filter(processed_at__isnull=True)
+        queued = enqueue_many(PROCESS_UPLOAD, ({'video_id': str(pk)} for pk in videos.values_list('pk', flat=True).iterator()))
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} videos for processing.'))
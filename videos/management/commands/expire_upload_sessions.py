@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from videos.models import UploadSession
+from videos.uploads import abort_upload
+
+
+class Command(BaseCommand):
+    help = 'Aborts chunked uploads that have been idle too long and frees their staged chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Idle time after which an upload is abandoned')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        expired = 0
+        for session in UploadSession.objects.filter(status='active', updated_at__lt=cutoff).iterator():
+            abort_upload(session)
+            expired += 1
+        self.stdout.write(self.style.SUCCESS(f'Aborted {expired} idle uploads.'))
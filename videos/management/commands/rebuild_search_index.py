@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from videos.models import Video
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored full-text search vector for every video'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Videos re-indexed per UPDATE')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        indexed = 0
+        last_pk = None
+        while True:
+            batch = Video.objects.order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+            indexed += Video.objects.filter(pk__in=pks).update_search_vector()
+
+        self.stdout.write(self.style.SUCCESS(f'Re-indexed {indexed} videos.'))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from videos.models import Video, count_subquery
+from interactions.models import Like, Comment, View
+from interactions.rollups import rolled_up_views, watermark_subquery
+
+
+def actual_counts():
+    return {
+        'like_count': count_subquery(Like, is_like=True),
+        'dislike_count': count_subquery(Like, is_like=False),
+        'comment_count': count_subquery(Comment),
+        # Compacted raw views survive only in the rollups
+        'view_count': rolled_up_views() + count_subquery(View, pk__gt=watermark_subquery()),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized engagement counters on videos and repairs any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Videos checked per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        fields = list(actual_counts())
+
+        checked = repaired = 0
+        last_pk = None
+        while True:
+            batch = Video.objects.order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(
+                batch.annotate(**{f'actual_{field}': expr for field, expr in actual_counts().items()})
+                .values('pk', *fields, *[f'actual_{field}' for field in fields])[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]['pk']
+            checked += len(batch)
+
+            drifted = [
+                row['pk'] for row in batch
+                if any(row[field] != row[f'actual_{field}'] for field in fields)
+            ]
+            if drifted and not dry_run:
+                # Recount inside the UPDATE so writes landing since the read are not lost
+                Video.objects.filter(pk__in=drifted).update(**actual_counts())
+            repaired += len(drifted)
+
+        verb = 'would repair' if dry_run else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} videos, {verb} {repaired}.'))
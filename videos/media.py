@@ -0,0 +1,157 @@
+import json
+import os
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from core.storage import download_to
+
+FFPROBE = getattr(settings, 'FFPROBE_BINARY', 'ffprobe')
+FFMPEG = getattr(settings, 'FFMPEG_BINARY', 'ffmpeg')
+PROBE_TIMEOUT = getattr(settings, 'FFPROBE_TIMEOUT_SECONDS', 120)
+THUMBNAIL_WIDTH = getattr(settings, 'THUMBNAIL_WIDTH', 640)
+TRANSCODE_TIMEOUT = getattr(settings, 'TRANSCODE_TIMEOUT_SECONDS', 2 * 60 * 60)
+
+# HLS ladder: (height, video bits per second, audio bits per second).
+# Rungs taller than the source are skipped rather than upscaled.
+HLS_LADDER = getattr(settings, 'HLS_LADDER', [
+    (240, 400_000, 64_000),
+    (480, 1_000_000, 96_000),
+    (720, 2_500_000, 128_000),
+])
+HLS_SEGMENT_SECONDS = getattr(settings, 'HLS_SEGMENT_SECONDS', 6)
+
+
+class MediaError(Exception):
+    pass
+
+
+@contextmanager
+def local_copy(fieldfile):
+    """
+    Yield a local path for a stored file: the file itself on filesystem
+    storage, otherwise a temporary copy streamed down in chunks.
+    """
+    try:
+        yield fieldfile.storage.path(fieldfile.name)
+        return
+    except NotImplementedError:
+        pass
+
+    suffix = os.path.splitext(fieldfile.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as copy:
+        download_to(fieldfile.storage, fieldfile.name, copy)
+        copy.flush()
+        yield copy.name
+
+
+def _run(command, timeout):
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=timeout, check=False)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise MediaError(f'{command[0]} failed: {e}') from e
+    if result.returncode != 0:
+        raise MediaError(f'{command[0]} exited with {result.returncode}: {result.stderr.decode(errors="replace")[-500:]}')
+    return result.stdout
+
+
+def probe(path):
+    """Duration, dimensions, bitrate and codecs of a media file, read with ffprobe."""
+    output = _run(
+        [FFPROBE, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+        PROBE_TIMEOUT,
+    )
+    info = json.loads(output)
+    streams = info.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    if video is None:
+        raise MediaError('No video stream found')
+
+    fmt = info.get('format', {})
+    width, height = video.get('width'), video.get('height')
+    # Phone footage is often stored landscape with a rotation flag
+    rotation = abs(int(video.get('tags', {}).get('rotate', 0) or 0))
+    for side_data in video.get('side_data_list', []):
+        rotation = abs(int(side_data.get('rotation', rotation) or 0))
+    if rotation in (90, 270):
+        width, height = height, width
+
+    def number(value, cast=float):
+        try:
+            return cast(float(value))
+        except (TypeError, ValueError):
+            return None
+
+    return {
+        'duration': number(fmt.get('duration')) or number(video.get('duration')),
+        'width': width,
+        'height': height,
+        'bitrate': number(fmt.get('bit_rate'), int),
+        'video_codec': video.get('codec_name', '')[:30],
+        'audio_codec': (audio or {}).get('codec_name', '')[:30],
+    }
+
+
+def extract_frame(path, output, at=1.0, width=THUMBNAIL_WIDTH):
+    """Write one JPEG frame from ``at`` seconds in, scaled to ``width``."""
+    _run(
+        [
+            FFMPEG, '-v', 'error', '-y', '-ss', f'{at:.3f}', '-i', path,
+            '-frames:v', '1', '-vf', f'scale={width}:-2', '-q:v', '3', output,
+        ],
+        PROBE_TIMEOUT,
+    )
+
+
+def ladder_for(height):
+    """The rungs worth encoding for a source of ``height`` pixels (always at least one)."""
+    rungs = [rung for rung in HLS_LADDER if rung[0] <= (height or 0)]
+    return rungs or [min(HLS_LADDER)]
+
+
+def transcode_hls(path, out_dir, source_width, source_height, has_audio=True):
+    """
+    Encode one H.264/AAC HLS rendition per ladder rung into ``out_dir`` and
+    write master.m3u8 over them. Keyframes are forced on segment boundaries
+    so players can switch renditions at any segment. Returns the rendition
+    metadata and the names of every file written.
+    """
+    renditions = []
+    for height, video_bitrate, audio_bitrate in ladder_for(source_height):
+        # Keep the source aspect ratio; H.264 needs even dimensions
+        width = max(2, round(source_width * height / source_height / 2) * 2) if source_width and source_height else None
+        name = f'{height}p'
+        command = [
+            FFMPEG, '-v', 'error', '-y', '-i', path,
+            '-map', '0:v:0', '-map', '0:a:0?',
+            '-vf', f'scale={width or -2}:{height}',
+            '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main', '-pix_fmt', 'yuv420p',
+            '-b:v', str(video_bitrate), '-maxrate', str(int(video_bitrate * 1.07)), '-bufsize', str(video_bitrate * 2),
+            '-force_key_frames', f'expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})', '-sc_threshold', '0',
+            '-c:a', 'aac', '-b:a', str(audio_bitrate), '-ac', '2',
+            '-f', 'hls', '-hls_time', str(HLS_SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', os.path.join(out_dir, f'{name}_%04d.ts'),
+            os.path.join(out_dir, f'{name}.m3u8'),
+        ]
+        _run(command, TRANSCODE_TIMEOUT)
+        renditions.append({
+            'name': name,
+            'playlist': f'{name}.m3u8',
+            'width': width,
+            'height': height,
+            # Peak rate, as BANDWIDTH is specified
+            'bandwidth': int(video_bitrate * 1.07) + (audio_bitrate if has_audio else 0),
+        })
+
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for rendition in renditions:
+        codecs = 'avc1.4d401f,mp4a.40.2' if has_audio else 'avc1.4d401f'
+        resolution = f',RESOLUTION={rendition["width"]}x{rendition["height"]}' if rendition['width'] else ''
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={rendition["bandwidth"]}{resolution},CODECS="{codecs}"')
+        lines.append(rendition['playlist'])
+    with open(os.path.join(out_dir, 'master.m3u8'), 'w') as master:
+        master.write('\n'.join(lines) + '\n')
+
+    return renditions, sorted(os.listdir(out_dir))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:02
+
+import storages.backends.azure_storage
+import videos.models
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Video = apps.get_model('videos', 'Video')
+    Like = apps.get_model('interactions', 'Like')
+    Comment = apps.get_model('interactions', 'Comment')
+    View = apps.get_model('interactions', 'View')
+
+    def count_subquery(model, **filters):
+        rows = (
+            model.objects.filter(video=OuterRef('pk'), **filters)
+            .order_by()
+            .values('video')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return Coalesce(Subquery(rows), 0)
+
+    Video.objects.update(
+        like_count=count_subquery(Like, is_like=True),
+        dislike_count=count_subquery(Like, is_like=False),
+        comment_count=count_subquery(Comment),
+        view_count=count_subquery(View),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0001_initial'),
+        ('interactions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='dislike_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=storages.backends.azure_storage.AzureStorage(), upload_to='thumbnails/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='video_file',
+            field=models.FileField(storage=storages.backends.azure_storage.AzureStorage(), upload_to='videos/%Y/%m/%d/', validators=[videos.models.validate_video_file_extension]),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_search_vectors(apps, schema_editor):
+    Video = apps.get_model('videos', 'Video')
+    Tag = apps.get_model('videos', 'Tag')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    tag_names = (
+        Tag.objects.filter(videos=OuterRef('pk'))
+        .order_by()
+        .values('videos')
+        .annotate(names=StringAgg('name', ' '))
+        .values('names')
+    )
+    creator_name = User.objects.filter(pk=OuterRef('user_id')).values('username')
+    Video.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english')
+        + SearchVector(Subquery(tag_names), weight='B', config='english')
+        + SearchVector(Subquery(creator_name), weight='C', config='english')
+        + SearchVector('description', weight='D', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0002_video_engagement_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='video_search_vector_gin'),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0004_tag_name_trigram_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['visibility', '-created_at', '-id'], name='video_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='video_user_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0005_video_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='videos.video')),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='videos.video')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['video', '-score'], name='videoneighbor_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('video', 'neighbor'), name='unique_video_neighbor')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0008_video_media_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='hls_playlist',
+            field=models.CharField(blank=True, editable=False, max_length=1024),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='renditions',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0009_video_hls_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='thumbnail_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:53
+
+import core.storage
+import videos.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0010_thumbnail_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='video',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.MediaStorage(), upload_to='thumbnails/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='video_file',
+            field=models.FileField(storage=core.storage.MediaStorage(), upload_to='videos/%Y/%m/%d/', validators=[videos.models.validate_video_file_extension]),
+        ),
+    ]
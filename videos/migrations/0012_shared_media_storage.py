@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:55
+
+import core.storage
+import videos.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0011_media_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='video',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.get_media_storage, upload_to='thumbnails/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='video_file',
+            field=models.FileField(storage=core.storage.get_media_storage, upload_to='videos/%Y/%m/%d/', validators=[videos.models.validate_video_file_extension]),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_video_counts(apps, schema_editor):
+    Tag = apps.get_model('videos', 'Tag')
+    Video = apps.get_model('videos', 'Video')
+    counts = (
+        Video.tags.through.objects.filter(tag=OuterRef('pk'))
+        .order_by()
+        .values('tag')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Tag.objects.update(video_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0013_video_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='video_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-video_count', 'name'], name='tag_popularity_idx'),
+        ),
+        migrations.RunPython(backfill_video_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_inboxes(apps, schema_editor):
+    # Give existing followers the recent uploads of the creators they follow
+    Follow = apps.get_model('users', 'CustomUser').followers.through
+    Video = apps.get_model('videos', 'Video')
+    InboxEntry = apps.get_model('videos', 'InboxEntry')
+    schema_editor.execute(
+        f'''
+        INSERT INTO {InboxEntry._meta.db_table} (user_id, video_id, created_at)
+        SELECT edge.to_customuser_id, recent.id, recent.created_at
+        FROM {Follow._meta.db_table} AS edge
+        CROSS JOIN LATERAL (
+            SELECT id, created_at FROM {Video._meta.db_table}
+            WHERE user_id = edge.from_customuser_id AND deleted_at IS NULL
+            ORDER BY created_at DESC, id DESC
+            LIMIT 20
+        ) AS recent
+        ON CONFLICT (user_id, video_id) DO NOTHING
+        '''
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0014_tag_video_count'),
+        ('users', '0005_customuser_deleted_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'inbox entries',
+            },
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='fanout_on_read',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('fanout_on_read', True)), fields=['user', '-created_at', '-id'], name='video_pull_feed_idx'),
+        ),
+        migrations.AddField(
+            model_name='inboxentry',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='inboxentry',
+            name='video',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='videos.video'),
+        ),
+        migrations.AddIndex(
+            model_name='inboxentry',
+            index=models.Index(fields=['user', '-created_at', '-video'], name='inbox_feed_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='inboxentry',
+            constraint=models.UniqueConstraint(fields=('user', 'video'), name='unique_inbox_entry'),
+        ),
+        migrations.RunPython(backfill_inboxes, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,18 @@
 from django.db import models
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Cast, Coalesce
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from django.utils.text import slugify
+import mimetypes
 import uuid
-from storages.backends.azure_storage import AzureStorage
+from core.storage import get_media_storage
 from django.core.exceptions import ValidationError
 import os
+from .blobcache import VIDEO_BLOB_CACHE_ENABLED
 
 User = get_user_model()
 
@@ -14,19 +22,102 @@ def validate_video_file_extension(value):
     if ext not in valid_extensions:
         raise ValidationError('Unsupported file format. Please upload a video file.')
 
+# Text search configuration used for both the stored vectors and the queries
+SEARCH_CONFIG = 'english'
+
+def count_subquery(model, **filters):
+    """Correlated COUNT(*) of ``model`` rows pointing at the outer video."""
+    rows = (
+        model.objects.filter(video=OuterRef('pk'), **filters)
+        .order_by()
+        .values('video')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+class VideoQuerySet(models.QuerySet):
+    def with_card_data(self, description=False):
+        """
+        Load everything a video card renders (creator, avatar, tags, counters)
+        up front so list pages run a fixed number of queries per page.
+        Cards that show the description can ask for it back.
+        """
+        videos = self.select_related('user').prefetch_related('tags').defer('search_vector')
+        if not description:
+            videos = videos.defer('description')
+        return videos
+
+    def visible_to(self, user):
+        """
+        The videos ``user`` may watch: public ones, their own, and
+        followers-only ones by creators they follow, as a single WHERE
+        clause. The follow test is an EXISTS probe of the followers table's
+        (creator, follower) unique index, so feeds ordered by
+        video_recent_idx stay index scans.
+        """
+        if not user.is_authenticated:
+            return self.filter(visibility='public')
+        follows_creator = Exists(
+            User.followers.through.objects.filter(from_customuser=OuterRef('user_id'), to_customuser=user.pk)
+        )
+        return self.filter(
+            Q(visibility='public') | Q(user=user.pk) | (Q(visibility='followers') & follows_creator)
+        )
+
+    def search(self, text):
+        """
+        Full-text match against the stored search vector, ranked by relevance
+        with the newest videos first among equal ranks.
+        """
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return (
+            self.filter(search_vector=query)
+            # ts_rank is a float4; widen it so the value round-trips exactly
+            # through keyset cursors
+            .annotate(rank=Cast(SearchRank(F('search_vector'), query), models.FloatField()))
+            .order_by('-rank', '-created_at')
+        )
+
+    def update_search_vector(self):
+        """
+        Recompute the stored search vector in a single UPDATE: title (A),
+        tags (B), creator name (C) and description (D).
+        """
+        tag_names = (
+            Tag.objects.filter(videos=OuterRef('pk'))
+            .order_by()
+            .values('videos')
+            .annotate(names=StringAgg('name', ' '))
+            .values('names')
+        )
+        creator_name = User.objects.filter(pk=OuterRef('user_id')).values('username')
+        return self.update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector(Subquery(tag_names), weight='B', config=SEARCH_CONFIG)
+            + SearchVector(Subquery(creator_name), weight='C', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='D', config=SEARCH_CONFIG)
+        ))
+
+class VideoManager(models.Manager.from_queryset(VideoQuerySet)):
+    """Live videos only; Video.all_objects also sees deleted ones awaiting the reaper."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 class Video(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='videos')
     video_file = models.FileField(
         upload_to='videos/%Y/%m/%d/', 
-        storage=AzureStorage(),
+        storage=get_media_storage,
         validators=[validate_video_file_extension]
     )
     thumbnail = models.ImageField(
         upload_to='thumbnails/%Y/%m/%d/', 
         blank=True, 
         null=True, 
-        storage=AzureStorage()
+        storage=get_media_storage
     )
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -43,23 +134,112 @@ class Video(models.Model):
         default='public'
     )
 
+    # Denormalized engagement counters, maintained by the write paths in
+    # interactions.views and repaired by the rebuild_video_counts command
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    dislike_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Media metadata probed by the videos.process_upload background job
+    duration = models.FloatField(null=True, blank=True, editable=False, help_text='Seconds')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    bitrate = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text='Bits per second')
+    video_codec = models.CharField(max_length=30, blank=True, editable=False)
+    audio_codec = models.CharField(max_length=30, blank=True, editable=False)
+    processed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # HLS ladder written by the videos.transcode_hls job: the storage name of
+    # the master playlist and one {name, playlist, width, height, bandwidth}
+    # entry per rendition
+    hls_playlist = models.CharField(max_length=1024, blank=True, editable=False)
+    renditions = models.JSONField(default=list, blank=True, editable=False)
+    # Resized WebP/JPEG copies of the thumbnail, made by core.images
+    thumbnail_renditions = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Weighted full-text document, refreshed by videos.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Set when the owner deletes the video: it disappears from every page at
+    # once and the videos.reap job removes its rows and files in batches
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Set by the videos.fan_out job when the creator had too many followers
+    # to copy the video into every inbox; subscription feeds read such
+    # videos straight from the creator's uploads instead
+    fanout_on_read = models.BooleanField(default=False, editable=False)
+
+    objects = VideoManager()
+    all_objects = VideoQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.title} by {self.user.username}'
 
     @property
-    def like_count(self):
-        return self.likes.filter(is_like=True).count()
+    def hls_url(self):
+        if not self.hls_playlist:
+            return ''
+        if getattr(self.video_file.storage, 'expiration_secs', None):
+            # Signed URLs cannot be reached through the playlists' relative paths
+            return reverse('videos:hls_playlist', args=[self.pk, 'master.m3u8'])
+        return self.video_file.storage.url(self.hls_playlist)
 
     @property
-    def comment_count(self):
-        return self.comments.count()
+    def source_url(self):
+        """Where players fetch the original file: through the caching stream endpoint when it is on."""
+        if VIDEO_BLOB_CACHE_ENABLED:
+            return reverse('videos:stream', args=[self.pk])
+        return self.video_file.url
+
+    @property
+    def video_mime_type(self):
+        """Content type of the original upload, for the fallback <source> element."""
+        return mimetypes.guess_type(self.video_file.name)[0] or 'video/mp4'
+
+    def adjust_counts(self, **deltas):
+        """
+        Atomically apply counter deltas (e.g. like_count=1, dislike_count=-1)
+        in a single UPDATE, then reload the affected counters on this instance.
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        Video.objects.filter(pk=self.pk).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+        self.refresh_from_db(fields=list(deltas))
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='video_search_vector_gin'),
+            # Keyset pagination ranges for the public feed and profile pages
+            models.Index(fields=['visibility', '-created_at', '-id'], name='video_feed_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='video_user_feed_idx'),
+            # Signed-in feeds, whose visible_to() predicate spans visibilities
+            models.Index(fields=['-created_at', '-id'], name='video_recent_idx'),
+            # The few videos subscription feeds fan out on read
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                condition=models.Q(fanout_on_read=True),
+                name='video_pull_feed_idx',
+            ),
+        ]
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(unique=True)
+    # Number of videos carrying the tag, maintained by videos.signals and
+    # the videos.reap job
+    video_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='tag_name_trgm'),
+            # Popular tags index
+            models.Index(fields=['-video_count', 'name'], name='tag_popularity_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -68,3 +248,80 @@ class Tag(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class VideoNeighbor(models.Model):
+    """
+    One of a video's top-K most similar videos, precomputed offline by the
+    compute_video_neighbors command from tag overlap, co-views and co-likes.
+    """
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='neighbor_of')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'neighbor'], name='unique_video_neighbor'),
+        ]
+        indexes = [
+            models.Index(fields=['video', '-score'], name='videoneighbor_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.neighbor_id} is similar to {self.video_id} ({self.score:.3f})'
+
+
+class InboxEntry(models.Model):
+    """
+    A video in a follower's subscriptions feed, written when the creator
+    uploads (see videos.subscriptions). ``created_at`` copies the video's,
+    so a feed page is one range scan of the follower's entries.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='inbox_entries', db_index=False)
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='inbox_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = 'inbox entries'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'video'], name='unique_inbox_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-video'], name='inbox_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.video_id} in the feed of {self.user_id}'
+
+
+class UploadSession(models.Model):
+    """
+    A resumable chunked upload. Chunks are staged straight into storage
+    (uncommitted blocks of the target blob) and ``received`` tracks the next
+    byte expected, so a client can resume from it after a dropped connection.
+    """
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    received = models.BigIntegerField(default=0)
+    blob_name = models.CharField(max_length=1024)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    video = models.OneToOneField(Video, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_session')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.filename} ({self.received}/{self.size} bytes, {self.status})'
+
+    @property
+    def chunk_count(self):
+        return -(-self.size // self.chunk_size)
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from interactions.models import Like, View
+from .models import Video, VideoNeighbor
+
+NEIGHBORS_PER_VIDEO = getattr(settings, 'RECOMMENDATION_NEIGHBORS', 20)
+MIN_SIMILARITY = getattr(settings, 'RECOMMENDATION_MIN_SIMILARITY', 0.01)
+CO_VIEW_WINDOW = timedelta(days=getattr(settings, 'RECOMMENDATION_CO_VIEW_DAYS', 90))
+
+# Relative weight of each signal in the blended cosine similarity
+SIGNAL_WEIGHTS = getattr(settings, 'RECOMMENDATION_SIGNAL_WEIGHTS', {'tags': 0.3, 'views': 0.3, 'likes': 0.4})
+
+
+def _incidence(pairs, row_index):
+    """Binary sparse matrix with a row per video and a column per distinct key."""
+    rows, cols = [], []
+    col_index = {}
+    for video_id, key in pairs:
+        row = row_index.get(video_id)
+        if row is not None:
+            rows.append(row)
+            cols.append(col_index.setdefault(key, len(col_index)))
+    matrix = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(row_index), len(col_index)),
+    )
+    matrix.data[:] = 1  # duplicate (video, key) pairs were summed
+    return matrix
+
+
+def _idf(matrix):
+    """Down-weight columns shared by many videos (a tag on half the catalog says little)."""
+    document_frequency = np.diff(matrix.tocsc().indptr)
+    idf = np.log1p(matrix.shape[0] / np.maximum(document_frequency, 1)).astype(np.float32)
+    return matrix @ sp.diags(idf)
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    inverse = np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+    return sp.diags(inverse.astype(np.float32)) @ matrix
+
+
+def feature_matrix(video_ids, now=None):
+    """
+    Stack the L2-normalized tag, co-view and co-like blocks, each scaled by
+    the square root of its weight, so X @ X.T is the weighted sum of the
+    per-signal cosine similarities.
+    """
+    now = now or timezone.now()
+    row_index = {video_id: row for row, video_id in enumerate(video_ids)}
+    blocks = {
+        'tags': _idf(_incidence(
+            Video.tags.through.objects.values_list('video_id', 'tag_id').iterator(), row_index
+        )),
+        'views': _incidence(
+            View.objects.filter(user__isnull=False, created_at__gte=now - CO_VIEW_WINDOW)
+            .values_list('video_id', 'user_id').distinct().iterator(),
+            row_index,
+        ),
+        'likes': _incidence(
+            Like.objects.filter(is_like=True).values_list('video_id', 'user_id').iterator(), row_index
+        ),
+    }
+    return sp.hstack(
+        [np.sqrt(SIGNAL_WEIGHTS[name]) * _normalize_rows(block) for name, block in blocks.items()],
+        format='csr',
+    )
+
+
+def top_neighbors(features, k=NEIGHBORS_PER_VIDEO, chunk_size=1000):
+    """
+    Yield (row, neighbor_rows, scores) for every row, computing the
+    similarity matrix one block of rows at a time to bound memory.
+    """
+    transposed = features.T.tocsr()
+    for start in range(0, features.shape[0], chunk_size):
+        similarities = (features[start:start + chunk_size] @ transposed).tocsr()
+        for offset in range(similarities.shape[0]):
+            row = start + offset
+            begin, end = similarities.indptr[offset], similarities.indptr[offset + 1]
+            columns = similarities.indices[begin:end]
+            scores = similarities.data[begin:end]
+            keep = (columns != row) & (scores >= MIN_SIMILARITY)
+            columns, scores = columns[keep], scores[keep]
+            if len(scores) > k:
+                best = np.argpartition(-scores, k)[:k]
+                columns, scores = columns[best], scores[best]
+            order = np.argsort(-scores, kind='stable')
+            yield row, columns[order], scores[order]
+
+
+def rebuild_neighbors(k=NEIGHBORS_PER_VIDEO, chunk_size=1000):
+    """Recompute the neighbor table for all public videos; returns rows written."""
+    video_ids = list(Video.objects.filter(visibility='public').order_by('pk').values_list('pk', flat=True))
+    if not video_ids:
+        VideoNeighbor.objects.all().delete()
+        return 0
+    features = feature_matrix(video_ids)
+
+    written = 0
+    batch, batch_videos = [], []
+
+    def flush():
+        with transaction.atomic():
+            VideoNeighbor.objects.filter(video_id__in=batch_videos).delete()
+            VideoNeighbor.objects.bulk_create(batch)
+
+    for row, columns, scores in top_neighbors(features, k=k, chunk_size=chunk_size):
+        batch_videos.append(video_ids[row])
+        batch.extend(
+            VideoNeighbor(video_id=video_ids[row], neighbor_id=video_ids[column], score=float(score))
+            for column, score in zip(columns, scores)
+        )
+        if len(batch_videos) >= chunk_size:
+            flush()
+            written += len(batch)
+            batch, batch_videos = [], []
+    if batch_videos:
+        flush()
+        written += len(batch)
+
+    # Videos no longer public keep no neighbor lists
+    VideoNeighbor.objects.exclude(video__visibility='public').delete()
+    return written
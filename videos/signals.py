@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from core.images import needs_renditions
+from core.jobs import enqueue
+from .jobs import THUMBNAIL_RENDITIONS
+from .models import InboxEntry, Tag, Video
+from .subscriptions import backfill
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Video)
+def refresh_video_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Keep the stored search document in step with title/description edits."""
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    Video.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_save, sender=Video)
+def queue_thumbnail_renditions(sender, instance, update_fields=None, **kwargs):
+    """Resize new or replaced thumbnails, whichever path (form, job, admin) saved them."""
+    if update_fields is not None and 'thumbnail' not in update_fields:
+        return
+    if needs_renditions(instance, 'thumbnail'):
+        enqueue(THUMBNAIL_RENDITIONS, {'video_id': str(instance.pk)})
+
+
+@receiver(m2m_changed, sender=Video.tags.through)
+def refresh_tagged_search_vectors(sender, instance, action, reverse, pk_set, **kwargs):
+    """Tags feed into the search document, so re-index whenever they change."""
+    if action == 'pre_clear' and reverse:
+        # Clearing from the tag side does not report which videos lost it
+        instance._cleared_video_pks = list(instance.videos.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        video_pks = [instance.pk]
+    elif action == 'post_clear':
+        video_pks = getattr(instance, '_cleared_video_pks', [])
+    else:
+        video_pks = pk_set
+    if video_pks:
+        Video.objects.filter(pk__in=video_pks).update_search_vector()
+
+
+@receiver(m2m_changed, sender=Video.tags.through)
+def maintain_tag_video_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    """Apply each tagging change to Tag.video_count as a delta, which concurrent edits cannot lose."""
+    if action in ('pre_remove', 'pre_clear'):
+        # Removal reports the pks asked for, not the links that existed
+        links = sender.objects.filter(**{'tag' if reverse else 'video': instance})
+        if action == 'pre_remove':
+            links = links.filter(**{'video__in' if reverse else 'tag__in': pk_set})
+        instance._removed_tag_links = list(links.values_list('tag_id', flat=True))
+        return
+
+    if action == 'post_add':
+        tag_ids, delta = ([instance.pk], len(pk_set)) if reverse else (pk_set, 1)
+    elif action in ('post_remove', 'post_clear'):
+        removed = instance.__dict__.pop('_removed_tag_links', [])
+        tag_ids, delta = ([instance.pk], -len(removed)) if reverse else (removed, -1)
+    else:
+        return
+    if tag_ids and delta:
+        Tag.objects.filter(pk__in=tag_ids).update(video_count=F('video_count') + delta)
+
+
+@receiver(post_save, sender=User)
+def refresh_creator_search_vectors(sender, instance, created, update_fields=None, **kwargs):
+    """Creator names are searchable too; skip saves that cannot rename the user."""
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    Video.objects.filter(user=instance).update_search_vector()
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def sync_subscription_inboxes(sender, instance, action, reverse, pk_set, **kwargs):
+    """A new follower gets the creator's recent uploads; an unfollow takes them back out."""
+    if action == 'post_add':
+        if reverse:
+            # instance.following changed: instance is the follower
+            backfill((creator, instance.pk) for creator in pk_set)
+        else:
+            backfill((instance.pk, follower) for follower in pk_set)
+    elif action == 'post_remove':
+        if reverse:
+            InboxEntry.objects.filter(user=instance, video__user__in=pk_set).delete()
+        else:
+            InboxEntry.objects.filter(user__in=pk_set, video__user=instance).delete()
+    elif action == 'post_clear':
+        # An inbox only ever holds followed creators' uploads
+        if reverse:
+            InboxEntry.objects.filter(user=instance).delete()
+        else:
+            InboxEntry.objects.filter(video__user=instance).delete()
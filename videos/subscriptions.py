@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from core.pagination import KeysetPage, KeysetPaginator, encode_cursor
+from users.follow_graph import Follow, follow_counts, following_of
+from .models import InboxEntry, Video
+
+# Fan-out on write: an upload is copied into each follower's inbox, in
+# batches, by the videos.fan_out job, and a subscriptions page reads one
+# range of the viewer's own inbox. Past FANOUT_MAX_FOLLOWERS that write
+# costs more than it saves, so those creators' uploads are marked
+# fanout_on_read and merged into their followers' pages at read time
+FANOUT_MAX_FOLLOWERS = getattr(settings, 'FANOUT_MAX_FOLLOWERS', 10_000)
+FANOUT_BATCH_SIZE = getattr(settings, 'FANOUT_BATCH_SIZE', 1000)
+# Recent uploads copied into an inbox when its owner follows a creator
+INBOX_BACKFILL = getattr(settings, 'INBOX_BACKFILL', 20)
+SUBSCRIPTIONS_PER_PAGE = getattr(settings, 'SUBSCRIPTIONS_PER_PAGE', 12)
+
+# Shared, so the fan-out job's invalidation reaches the web processes
+PULLED_CREATORS_CACHE_ALIAS = 'shared'
+PULLED_CREATORS_CACHE_KEY = 'videos:pulled_creators'
+PULLED_CREATORS_TTL = getattr(settings, 'PULLED_CREATORS_TTL', 5 * 60)
+
+FEED_ORDERING = ('-created_at', '-pk')
+
+
+def fan_out(video, batch_size=FANOUT_BATCH_SIZE):
+    """
+    Copy ``video`` into its creator's followers' inboxes, or mark it
+    fanout_on_read if they are too many; returns the number of followers
+    reached. Each batch is one short INSERT ... SELECT over the followers
+    table, so the IDs never travel to Python, and a re-run after a crash
+    skips the rows already written.
+    """
+    if follow_counts(video.user_id)[0] >= FANOUT_MAX_FOLLOWERS:
+        Video.objects.filter(pk=video.pk).update(fanout_on_read=True)
+        caches[PULLED_CREATORS_CACHE_ALIAS].delete(PULLED_CREATORS_CACHE_KEY)
+        return 0
+
+    inbox, follow = InboxEntry._meta.db_table, Follow._meta.db_table
+    params = {'creator': video.user_id, 'video': video.pk, 'created_at': video.created_at, 'batch': batch_size}
+    reached, after = 0, 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                WITH batch AS (
+                    SELECT to_customuser_id AS follower_id FROM {follow}
+                    WHERE from_customuser_id = %(creator)s AND to_customuser_id > %(after)s
+                    ORDER BY to_customuser_id
+                    LIMIT %(batch)s
+                ), inserted AS (
+                    INSERT INTO {inbox} (user_id, video_id, created_at)
+                    SELECT follower_id, %(video)s, %(created_at)s FROM batch
+                    ON CONFLICT (user_id, video_id) DO NOTHING
+                )
+                SELECT count(*), max(follower_id) FROM batch
+                ''',
+                {**params, 'after': after},
+            )
+            count, after = cursor.fetchone()
+        reached += count
+        if count < batch_size:
+            return reached
+
+
+def backfill(pairs, limit=INBOX_BACKFILL):
+    """
+    Copy each creator's latest ``limit`` fanned-out uploads into the inbox
+    of the follower paired with them, for ``(creator_id, follower_id)``
+    pairs that just became follow edges. One statement for any number of pairs.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    inbox, video_table = InboxEntry._meta.db_table, Video._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            INSERT INTO {inbox} (user_id, video_id, created_at)
+            SELECT pair.follower_id, recent.id, recent.created_at
+            FROM unnest(%(creators)s::bigint[], %(followers)s::bigint[]) AS pair (creator_id, follower_id)
+            CROSS JOIN LATERAL (
+                SELECT id, created_at FROM {video_table}
+                WHERE user_id = pair.creator_id AND NOT fanout_on_read AND deleted_at IS NULL
+                ORDER BY created_at DESC, id DESC
+                LIMIT %(limit)s
+            ) AS recent
+            ON CONFLICT (user_id, video_id) DO NOTHING
+            ''',
+            {
+                'creators': [creator for creator, _ in pairs],
+                'followers': [follower for _, follower in pairs],
+                'limit': limit,
+            },
+        )
+
+
+def pulled_creators():
+    """IDs of the creators with fanout_on_read uploads."""
+    cache = caches[PULLED_CREATORS_CACHE_ALIAS]
+    creators = cache.get(PULLED_CREATORS_CACHE_KEY)
+    if creators is None:
+        creators = set(
+            Video.objects.filter(fanout_on_read=True).order_by().values_list('user_id', flat=True).distinct()
+        )
+        cache.set(PULLED_CREATORS_CACHE_KEY, creators, PULLED_CREATORS_TTL)
+    return creators
+
+
+def subscription_page(user, cursor=None, per_page=SUBSCRIPTIONS_PER_PAGE):
+    """
+    A page of the uploads of the creators ``user`` follows, newest first.
+    The viewer's inbox and, when they follow any, the fanout_on_read
+    creators' uploads are each read one page past the cursor along their
+    own index, then merged; the two share one cursor format, so paging
+    works across both.
+    """
+    sources = [
+        KeysetPaginator(
+            # A follow can copy an upload into the inbox before its
+            # fan-out job turns it fanout_on_read; the other source has it
+            InboxEntry.objects.filter(user=user, video__deleted_at__isnull=True, video__fanout_on_read=False)
+            .exclude(video__visibility='private')
+            .select_related('video__user')
+            .prefetch_related('video__tags')
+            .defer('video__description', 'video__search_vector'),
+            per_page,
+            ordering=('-created_at', '-video_id'),
+        )
+    ]
+    pulled = sorted(pulled_creators() & set(following_of(user.pk)))
+    if pulled:
+        sources.append(KeysetPaginator(
+            Video.objects.filter(user__in=pulled, fanout_on_read=True)
+            .exclude(visibility='private')
+            .with_card_data(),
+            per_page,
+            ordering=FEED_ORDERING,
+        ))
+    pages = [source.get_page(cursor) for source in sources]
+
+    videos = [entry.video for entry in pages[0]] + [video for page in pages[1:] for video in page]
+    videos.sort(key=lambda video: (video.created_at, video.pk), reverse=True)
+    # Every source fell back to its first page unless the cursor is usable
+    sought = sources[0].seek(cursor)
+    direction = sought[0] if sought else None
+
+    def cursor_for(way, video):
+        return encode_cursor(way, [video.created_at, video.pk])
+
+    if direction == 'p':
+        # Each source returned the rows just above the cursor
+        rows = videos[-per_page:]
+        more = len(videos) > per_page or any(page.has_previous() for page in pages)
+        return KeysetPage(
+            rows,
+            next_cursor=cursor_for('n', rows[-1]) if rows else None,
+            previous_cursor=cursor_for('p', rows[0]) if more else None,
+        )
+    rows = videos[:per_page]
+    more = len(videos) > per_page or any(page.has_next() for page in pages)
+    return KeysetPage(
+        rows,
+        next_cursor=cursor_for('n', rows[-1]) if more else None,
+        previous_cursor=cursor_for('p', rows[0]) if rows and direction else None,
+    )
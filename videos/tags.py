@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.text import slugify
+from .models import Tag
+
+# The navbar lists the top few tags, the /videos/tags/ cloud many more;
+# both read one cached index, refreshed every POPULAR_TAGS_TTL seconds
+POPULAR_TAGS_CACHE_KEY = 'videos:popular_tags'
+POPULAR_TAGS_SIZE = getattr(settings, 'POPULAR_TAGS_SIZE', 100)
+POPULAR_TAGS_TTL = getattr(settings, 'POPULAR_TAGS_TTL', 5 * 60)
+NAVBAR_TAGS = getattr(settings, 'NAVBAR_TAGS', 8)
+
+
+def resolve_tags(names):
+    """
+    Tag objects for a list of names, in order, creating the missing ones:
+    one INSERT ... ON CONFLICT DO NOTHING and one SELECT whatever the list
+    length, so concurrent uploads of a new tag cannot collide. A name whose
+    slug already belongs to another tag ('hip hop' vs 'hip-hop') resolves
+    to that tag; names with no slug at all are dropped.
+    """
+    slugs = {}
+    for name in names:
+        name = name.strip().lower()
+        slug = slugify(name)
+        if slug and name not in slugs:
+            slugs[name] = slug
+    if not slugs:
+        return []
+
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug) for name, slug in slugs.items()],
+        ignore_conflicts=True,
+    )
+    found = Tag.objects.filter(Q(name__in=slugs) | Q(slug__in=slugs.values()))
+    by_name = {tag.name: tag for tag in found}
+    by_slug = {tag.slug: tag for tag in found}
+
+    tags = []
+    for name, slug in slugs.items():
+        tag = by_name.get(name) or by_slug[slug]
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def popular_tags(limit=POPULAR_TAGS_SIZE):
+    """
+    The most used tags as ``{name, slug, video_count}`` dicts, from a
+    per-process cache; stale by at most POPULAR_TAGS_TTL seconds.
+    """
+    index = cache.get(POPULAR_TAGS_CACHE_KEY)
+    if index is None:
+        index = list(
+            Tag.objects.filter(video_count__gt=0)
+            .order_by('-video_count', 'name')
+            .values('name', 'slug', 'video_count')[:POPULAR_TAGS_SIZE]
+        )
+        cache.set(POPULAR_TAGS_CACHE_KEY, index, POPULAR_TAGS_TTL)
+    return index[:limit]
+
+
+def navbar_tags():
+    return popular_tags(NAVBAR_TAGS)
@@ -1,3 +1,219 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from interactions import buffer
+from . import subscriptions
+from .models import InboxEntry, Video, Tag
+
+User = get_user_model()
+
+
+class CardDataQueryCountTests(TestCase):
+    """List pages must not issue per-card queries for creators, tags or counts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(name='music')
+
+    def create_videos(self, count):
+        for i in range(count):
+            creator = User.objects.create_user(
+                username=f'creator{Video.objects.count()}',
+                password='testpass123',
+                profile_pic='profile_pics/avatar.png',
+            )
+            video = Video.objects.create(
+                user=creator,
+                title=f'Music video {i}',
+                description='A searchable music video',
+                video_file='videos/sample.mp4',
+                thumbnail='thumbnails/sample.png',
+            )
+            video.tags.add(self.tag)
+
+    def count_queries(self, url):
+        # Pages read some data (popular tags, follow counts) through the
+        # caches; measure every request cold so the counts are comparable
+        cache.clear()
+        caches['shared'].clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url):
+        self.create_videos(1)
+        small = self.count_queries(url)
+        self.create_videos(7)
+        large = self.count_queries(url)
+        self.assertEqual(small, large)
+
+    def test_with_card_data_loads_relations_up_front(self):
+        self.create_videos(3)
+        with self.assertNumQueries(2):
+            for video in Video.objects.with_card_data():
+                video.user.username
+                video.user.profile_pic.name
+                list(video.tags.all())
+                video.like_count, video.comment_count, video.view_count
+
+    def test_with_card_data_defers_description(self):
+        self.create_videos(1)
+        self.assertIn('description', Video.objects.with_card_data().get().get_deferred_fields())
+        self.assertNotIn('description', Video.objects.with_card_data(description=True).get().get_deferred_fields())
+
+    def test_home_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('core:home'))
+
+    def test_search_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('videos:search') + '?q=music')
+
+    def test_tag_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('videos:tag', args=[self.tag.slug]))
+
+    def test_profile_query_count_is_constant(self):
+        owner = User.objects.create_user(username='owner', password='testpass123', profile_pic='profile_pics/owner.png')
+        url = reverse('users:profile', args=[owner.username])
+        Video.objects.create(user=owner, title='First', video_file='videos/a.mp4', thumbnail='thumbnails/a.png')
+        small = self.count_queries(url)
+        for i in range(7):
+            Video.objects.create(user=owner, title=f'More {i}', video_file='videos/b.mp4', thumbnail='thumbnails/b.png')
+        self.assertEqual(small, self.count_queries(url))
+
+
+class SubscriptionFeedTests(TestCase):
+    """Uploads reach followers through their inboxes, or on read for creators past the fan-out limit."""
+
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username='viewer', password='testpass123')
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.star = User.objects.create_user(username='star', password='testpass123')
+
+    def upload(self, user, title):
+        video = Video.objects.create(user=user, title=title, video_file='videos/sample.mp4')
+        subscriptions.fan_out(video)
+        return video
+
+    def walk(self, per_page, cursor=None, backward=False):
+        titles = []
+        while True:
+            page = subscriptions.subscription_page(self.viewer, cursor, per_page)
+            titles = [video.title for video in page] + titles if backward else titles + [video.title for video in page]
+            if not (page.has_previous() if backward else page.has_next()):
+                return titles
+            cursor = page.previous_cursor if backward else page.next_cursor
+
+    def test_uploads_reach_followers_inboxes(self):
+        self.creator.followers.add(self.viewer)
+        video = self.upload(self.creator, 'New')
+        self.assertTrue(InboxEntry.objects.filter(user=self.viewer, video=video).exists())
+        self.assertEqual([v.title for v in subscriptions.subscription_page(self.viewer)], ['New'])
+
+    def test_new_follower_gets_recent_uploads_and_unfollow_removes_them(self):
+        for i in range(3):
+            self.upload(self.creator, f'Old {i}')
+        self.creator.followers.add(self.viewer)
+        self.assertEqual(self.walk(10), ['Old 2', 'Old 1', 'Old 0'])
+        self.viewer.following.remove(self.creator)
+        self.assertEqual(self.walk(10), [])
+
+    def test_private_and_deleted_videos_are_hidden(self):
+        self.creator.followers.add(self.viewer)
+        self.upload(self.creator, 'Shown')
+        private = self.upload(self.creator, 'Private')
+        deleted = self.upload(self.creator, 'Deleted')
+        Video.objects.filter(pk=private.pk).update(visibility='private')
+        Video.objects.filter(pk=deleted.pk).update(deleted_at=deleted.created_at)
+        self.assertEqual(self.walk(10), ['Shown'])
+
+    def test_large_creators_are_merged_in_on_read(self):
+        fan = User.objects.create_user(username='fan', password='testpass123')
+        self.creator.followers.add(self.viewer)
+        self.star.followers.add(self.viewer, fan)
+        with mock.patch.object(subscriptions, 'FANOUT_MAX_FOLLOWERS', 2):
+            for i in range(4):
+                self.upload(self.creator, f'Creator {i}')
+                star_video = self.upload(self.star, f'Star {i}')
+        star_video.refresh_from_db()
+        self.assertTrue(star_video.fanout_on_read)
+        self.assertFalse(InboxEntry.objects.filter(video__user=self.star).exists())
+
+        expected = [f'{who} {i}' for i in range(3, -1, -1) for who in ('Star', 'Creator')]
+        for per_page in (1, 3, 8):
+            self.assertEqual(self.walk(per_page), expected)
+            last = subscriptions.subscription_page(self.viewer, None, per_page)
+            while last.has_next():
+                last = subscriptions.subscription_page(self.viewer, last.next_cursor, per_page)
+            if last.has_previous():
+                self.assertEqual(self.walk(per_page, last.previous_cursor, backward=True) + [v.title for v in last], expected)
+
+
+class VisibleToTests(TestCase):
+    """Feeds show followers-only videos to followers, and private ones only to their owner."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='testpass123')
+        cls.follower = User.objects.create_user(username='follower', password='testpass123')
+        cls.stranger = User.objects.create_user(username='stranger', password='testpass123')
+        cls.owner.followers.add(cls.follower)
+        cls.tag = Tag.objects.create(name='music')
+        for visibility in ('public', 'followers', 'private'):
+            video = Video.objects.create(
+                user=cls.owner, title=f'{visibility} music', video_file='videos/sample.mp4', visibility=visibility,
+            )
+            video.tags.add(cls.tag)
+
+    def setUp(self):
+        cache.clear()
+
+    def visible(self, user):
+        return set(Video.objects.visible_to(user).values_list('visibility', flat=True))
+
+    def test_visible_to(self):
+        self.assertEqual(self.visible(AnonymousUser()), {'public'})
+        self.assertEqual(self.visible(self.stranger), {'public'})
+        self.assertEqual(self.visible(self.follower), {'public', 'followers'})
+        self.assertEqual(self.visible(self.owner), {'public', 'followers', 'private'})
+
+    def test_feeds_show_followers_only_videos_to_followers(self):
+        urls = [
+            reverse('core:home'),
+            reverse('videos:search') + '?q=music',
+            reverse('videos:tag', args=[self.tag.slug]),
+            reverse('users:profile', args=[self.owner.username]),
+        ]
+        for user, shown in ((self.stranger, False), (self.follower, True)):
+            self.client.force_login(user)
+            for url in urls:
+                with self.subTest(user=user.username, url=url):
+                    content = self.client.get(url).content.decode()
+                    self.assertIn('public music', content)
+                    self.assertEqual('followers music' in content, shown)
+                    self.assertNotIn('private music', content)
+
+    @mock.patch.object(buffer, 'VIEW_BUFFER_ENABLED', False)
+    def test_record_view_refuses_hidden_videos(self):
+        video = Video.objects.get(visibility='followers')
+        url = reverse('interactions:record_view', args=[video.pk])
+        ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        self.client.force_login(self.stranger)
+        self.assertEqual(self.client.get(url, **ajax).status_code, 403)
+        self.client.force_login(self.follower)
+        self.assertEqual(self.client.get(url, **ajax).status_code, 200)
+
 
-# Create your tests here.
+class UploadPageTests(TestCase):
+    def test_upload_page_renders_with_chunked_upload_script(self):
+        self.client.force_login(User.objects.create_user(username='uploader', password='testpass123'))
+        response = self.client.get(reverse('videos:upload'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'js/upload.js', count=1)
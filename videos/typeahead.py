@@ -0,0 +1,91 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import BooleanField, Case, Q, Value, When
+from .models import Tag
+
+User = get_user_model()
+
+SUGGEST_LIMIT = getattr(settings, 'TYPEAHEAD_LIMIT', 8)
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 50
+
+
+class PrefixCache:
+    """
+    Thread-safe in-process LRU with a TTL. Typeahead traffic is dominated by
+    a small set of hot prefixes, so most keystrokes never reach Postgres.
+    """
+
+    def __init__(self, maxsize=2048, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+prefix_cache = PrefixCache(
+    maxsize=getattr(settings, 'TYPEAHEAD_CACHE_SIZE', 2048),
+    ttl=getattr(settings, 'TYPEAHEAD_CACHE_TTL', 60),
+)
+
+
+def _matching(queryset, field, prefix, limit):
+    """
+    Rank prefix matches first, then trigram neighbours. Both the anchored
+    regex and the % operator are served by the column's gin_trgm_ops index.
+    """
+    is_prefix = Q(**{f'{field}__iregex': '^' + re.escape(prefix)})
+    return list(
+        queryset.filter(is_prefix | Q(**{f'{field}__trigram_similar': prefix}))
+        .annotate(
+            starts_with=Case(When(is_prefix, then=Value(True)), default=Value(False), output_field=BooleanField()),
+            similarity=TrigramSimilarity(field, prefix),
+        )
+        .order_by('-starts_with', '-similarity', field)
+        .values_list(field, flat=True)[:limit]
+    )
+
+
+def suggest(prefix, limit=SUGGEST_LIMIT):
+    """Top tag names and creator usernames for a partially typed query."""
+    prefix = prefix.strip().lower()[:MAX_PREFIX_LENGTH]
+    if len(prefix) < MIN_PREFIX_LENGTH:
+        return {'tags': [], 'creators': []}
+
+    key = (prefix, limit)
+    suggestions = prefix_cache.get(key)
+    if suggestions is None:
+        suggestions = {
+            'tags': _matching(Tag.objects.all(), 'name', prefix, limit),
+            'creators': _matching(User.objects.filter(is_active=True), 'username', prefix, limit),
+        }
+        prefix_cache.set(key, suggestions)
+    return suggestions
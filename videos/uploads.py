@@ -0,0 +1,198 @@
+import base64
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from storages.backends.azure_storage import AzureStorage
+from .models import UploadSession, Video
+
+# Bytes per chunk: the most a single upload holds in worker memory at once
+UPLOAD_CHUNK_SIZE = getattr(settings, 'VIDEO_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+UPLOAD_MAX_SIZE = getattr(settings, 'VIDEO_UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024)
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi', '.wmv', '.flv', '.webm']
+
+# 'azure' stages Azure block-blob blocks, 'filesystem' a local part file;
+# by default the backend follows the storage behind Video.video_file
+UPLOAD_STAGING = getattr(settings, 'VIDEO_UPLOAD_STAGING', None)
+UPLOAD_STAGING_DIR = getattr(settings, 'VIDEO_UPLOAD_STAGING_DIR', os.path.join(tempfile.gettempdir(), 'clipclap-uploads'))
+
+# Pieces copied from the request stream at a time
+COPY_BUFFER_SIZE = 64 * 1024
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(Exception):
+    """A protocol error, reported to the client with ``status``."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class AzureBlockStaging:
+    """
+    Each chunk becomes an uncommitted block of the target blob; completing
+    the upload commits the block list in order. Abandoned blocks are
+    garbage-collected by Azure after a week.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def _blob(self, session):
+        return self.storage.client.get_blob_client(self.storage._get_valid_path(session.blob_name))
+
+    @staticmethod
+    def block_id(index):
+        # Block IDs must all have the same length within a blob
+        return base64.b64encode(f'{index:08d}'.encode()).decode()
+
+    def stage(self, session, index, offset, stream, length):
+        self._blob(session).stage_block(self.block_id(index), stream, length=length)
+
+    def commit(self, session):
+        from azure.storage.blob import BlobBlock, ContentSettings
+
+        self._blob(session).commit_block_list(
+            [BlobBlock(block_id=self.block_id(index)) for index in range(session.chunk_count)],
+            content_settings=ContentSettings(content_type=session.content_type or None),
+        )
+        return session.blob_name
+
+    def abort(self, session):
+        pass
+
+
+class FileSystemStaging:
+    """
+    Local stand-in: chunks are written at their offset into a part file,
+    which is streamed into the video storage on completion.
+    """
+
+    def __init__(self, storage, location=UPLOAD_STAGING_DIR):
+        self.storage = storage
+        self.location = Path(location)
+
+    def _part(self, session):
+        return self.location / f'{session.pk}.part'
+
+    def stage(self, session, index, offset, stream, length):
+        part = self._part(session)
+        part.parent.mkdir(parents=True, exist_ok=True)
+        with open(part, 'r+b' if part.exists() else 'wb') as out:
+            out.seek(offset)
+            remaining = length
+            while remaining:
+                piece = stream.read(min(COPY_BUFFER_SIZE, remaining))
+                if not piece:
+                    raise UploadError('Chunk body is shorter than its Content-Range')
+                out.write(piece)
+                remaining -= len(piece)
+            out.truncate(offset + length)
+
+    def commit(self, session):
+        part = self._part(session)
+        with open(part, 'rb') as source:
+            name = self.storage.save(session.blob_name, File(source, name=session.filename))
+        part.unlink()
+        return name
+
+    def abort(self, session):
+        self._part(session).unlink(missing_ok=True)
+
+
+def get_staging():
+    storage = Video._meta.get_field('video_file').storage
+    backend = UPLOAD_STAGING or ('azure' if isinstance(storage, AzureStorage) else 'filesystem')
+    if backend == 'azure':
+        return AzureBlockStaging(storage)
+    return FileSystemStaging(storage)
+
+
+def start_upload(user, filename, size, content_type=''):
+    """Validate the announced file and open a session for it."""
+    filename = os.path.basename(filename or '')
+    if os.path.splitext(filename)[1].lower() not in VIDEO_EXTENSIONS:
+        raise UploadError('Unsupported file format. Please upload a video file.')
+    if size <= 0:
+        raise UploadError('The file is empty.')
+    if size > UPLOAD_MAX_SIZE:
+        raise UploadError(f'File size exceeds the {UPLOAD_MAX_SIZE // (1024 * 1024)}MB limit.')
+
+    field = Video._meta.get_field('video_file')
+    blob_name = field.storage.get_available_name(field.generate_filename(None, filename))
+    return UploadSession.objects.create(
+        user=user,
+        filename=filename,
+        content_type=content_type[:100],
+        size=size,
+        chunk_size=UPLOAD_CHUNK_SIZE,
+        blob_name=blob_name,
+    )
+
+
+def parse_content_range(header):
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError('Missing or malformed Content-Range header')
+    start, end, total = map(int, match.groups())
+    if end < start:
+        raise UploadError('Empty Content-Range')
+    return start, end, total
+
+
+def append_chunk(session, content_range, stream):
+    """
+    Stage the chunk at ``content_range`` from ``stream`` without buffering
+    it. Chunks must arrive in order at chunk-size boundaries; resending the
+    last acknowledged range is rejected with the offset to resume from.
+    Returns the new offset.
+    """
+    if session.status != 'active':
+        raise UploadError('Upload session is no longer active', status=409)
+    start, end, total = parse_content_range(content_range)
+    length = end - start + 1
+    if total != session.size:
+        raise UploadError('Content-Range total does not match the announced size')
+    if start != session.received:
+        raise UploadError(f'Expected a chunk starting at byte {session.received}', status=409)
+    is_last = end + 1 == session.size
+    if start % session.chunk_size or (length != session.chunk_size and not is_last) or length > session.chunk_size:
+        raise UploadError(f'Chunks must be {session.chunk_size} bytes (except the last)')
+
+    get_staging().stage(session, start // session.chunk_size, start, stream, length)
+
+    # Only the request that still sees the expected offset advances it
+    advanced = (
+        UploadSession.objects.filter(pk=session.pk, received=start, status='active')
+        .update(received=end + 1, updated_at=timezone.now())
+    )
+    if not advanced:
+        session.refresh_from_db(fields=['received', 'status'])
+        raise UploadError(f'Expected a chunk starting at byte {session.received}', status=409)
+    session.received = end + 1
+    return session.received
+
+
+def complete_upload(session):
+    """Commit the staged chunks and return the stored file name."""
+    if session.status != 'active':
+        raise UploadError('Upload session is no longer active', status=409)
+    if session.received != session.size:
+        raise UploadError(f'Upload incomplete: {session.received} of {session.size} bytes received', status=409)
+    name = get_staging().commit(session)
+    session.blob_name = name
+    session.status = 'complete'
+    session.save(update_fields=['blob_name', 'status', 'updated_at'])
+    return name
+
+
+def abort_upload(session):
+    get_staging().abort(session)
+    session.status = 'aborted'
+    session.save(update_fields=['status', 'updated_at'])
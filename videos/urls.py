@@ -5,9 +5,18 @@ app_name = 'videos'
 
 urlpatterns = [
     path('upload/', views.upload_video, name='upload'),
+    path('upload/chunked/', views.upload_init, name='upload_init'),
+    path('upload/chunked/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
+    path('upload/chunked/<uuid:upload_id>/complete/', views.upload_complete, name='upload_complete'),
     path('watch/<uuid:video_id>/', views.watch_video, name='watch'),
+    path('stream/<uuid:video_id>/', views.stream_video, name='stream'),
+    path('hls/<uuid:video_id>/<str:filename>', views.hls_playlist, name='hls_playlist'),
     path('edit/<uuid:video_id>/', views.edit_video, name='edit'),
     path('delete/<uuid:video_id>/', views.delete_video, name='delete'),
     path('search/', views.search, name='search'),
+    path('search/suggest/', views.search_suggestions, name='search_suggestions'),
+    path('subscriptions/', views.subscriptions, name='subscriptions'),
+    path('tags/', views.tag_list, name='tags'),
     path('tag/<slug:tag_slug>/', views.videos_by_tag, name='tag'),
+    path('metrics/blob-cache/', views.blob_cache_stats, name='blob_cache_stats'),
 ]
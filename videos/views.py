@@ -1,11 +1,27 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import Video, Tag
-from .forms import VideoUploadForm
-from interactions.models import Like, View
-from django.db.models import Q
-from django.db.models import Count
+from .models import Video, Tag, UploadSession
+from .forms import VideoUploadForm, VideoDetailsForm
+from .blobcache import RangeNotSatisfiable, blob_cache, parse_range, read_file, read_storage
+from .jobs import enqueue_fan_out, enqueue_processing, soft_delete
+from .uploads import UploadError, abort_upload, append_chunk, complete_upload, start_upload
+from .subscriptions import subscription_page
+from .tags import popular_tags
+from .typeahead import suggest
+from interactions.buffer import enqueue_view
+from interactions.comments import comment_page
+from interactions.uniques import viewer_key
+from core.pagination import KeysetPaginator
+from core.storage import get_media_storage, prefetch_urls
+from users.follow_graph import follows
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.core.cache import cache
+from django.urls import reverse
+import math
+import os
 import traceback
 
 @login_required
@@ -26,6 +42,11 @@ def upload_video(request):
                 tags = form.cleaned_data['tags']
                 video.tags.set(tags)
                 
+                # Probe metadata and make a thumbnail in the background
+                enqueue_processing(video)
+                # Deliver it to followers' subscription feeds
+                enqueue_fan_out(video)
+                
                 # Display success message
                 messages.success(request, 'Video uploaded successfully!')
                 
@@ -49,6 +70,98 @@ def upload_video(request):
     
     return render(request, 'videos/upload.html', {'form': form})
 
+def upload_error(error, session=None):
+    payload = {'status': 'error', 'message': str(error)}
+    if session is not None:
+        payload['offset'] = session.received
+    return JsonResponse(payload, status=error.status)
+
+@login_required
+def upload_init(request):
+    """
+    Open a resumable upload for the file described by ``filename``, ``size``
+    and ``content_type``; the client then PUTs chunks to the returned URL.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'POST required'}, status=405)
+    try:
+        size = int(request.POST.get('size', ''))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid file size'}, status=400)
+    try:
+        session = start_upload(request.user, request.POST.get('filename'), size, request.POST.get('content_type', ''))
+    except UploadError as e:
+        return upload_error(e)
+
+    return JsonResponse({
+        'status': 'success',
+        'upload_id': str(session.pk),
+        'chunk_size': session.chunk_size,
+        'offset': session.received,
+        'upload_url': reverse('videos:upload_chunk', args=[session.pk]),
+        'complete_url': reverse('videos:upload_complete', args=[session.pk]),
+    }, status=201)
+
+@login_required
+def upload_chunk(request, upload_id):
+    """
+    PUT one chunk (with a Content-Range header) to stream it into staging,
+    GET the offset to resume from, or DELETE to abandon the upload.
+    """
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+    if request.method == 'PUT':
+        if request.META.get('CONTENT_LENGTH', '') in ('', '0'):
+            return JsonResponse({'status': 'error', 'message': 'Content-Length required'}, status=411)
+        try:
+            # The request itself is the stream: the chunk is never read into memory whole
+            append_chunk(session, request.headers.get('Content-Range'), request)
+        except UploadError as e:
+            return upload_error(e, session)
+    elif request.method == 'DELETE':
+        if session.status == 'active':
+            abort_upload(session)
+    elif request.method != 'GET':
+        return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+    return JsonResponse({
+        'status': 'success',
+        'state': session.status,
+        'offset': session.received,
+        'size': session.size,
+    })
+
+@login_required
+def upload_complete(request, upload_id):
+    """Commit the staged chunks and create the video from the submitted details."""
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'POST required'}, status=405)
+    if session.status == 'complete' and session.video_id:
+        # A retried completion after the response was lost
+        return JsonResponse({'status': 'success', 'redirect': reverse('videos:watch', args=[session.video_id])})
+
+    form = VideoDetailsForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return JsonResponse({'status': 'error', 'message': 'Invalid video details', 'errors': form.errors}, status=400)
+    try:
+        name = complete_upload(session)
+    except UploadError as e:
+        return upload_error(e, session)
+
+    with transaction.atomic():
+        video = form.save(commit=False)
+        video.user = request.user
+        video.video_file.name = name
+        video.save()
+        video.tags.set(form.cleaned_data['tags'])
+        session.video = video
+        session.save(update_fields=['video', 'updated_at'])
+        enqueue_processing(video)
+        enqueue_fan_out(video)
+
+    messages.success(request, 'Video uploaded successfully!')
+    return JsonResponse({'status': 'success', 'redirect': reverse('videos:watch', args=[video.id])})
+
 def watch_video(request, video_id):
     """
     View to watch a video, ensuring access control based on visibility settings.
@@ -56,22 +169,22 @@ def watch_video(request, video_id):
     video = get_object_or_404(Video, id=video_id)
 
     # Check visibility restrictions
-    if video.visibility == 'private' and video.user != request.user:
+    if video.visibility == 'private' and video.user_id != request.user.pk:
         messages.error(request, 'This video is private.')
-        return redirect('home')
+        return redirect('core:home')
     elif video.visibility == 'followers' and not request.user.is_authenticated:
         messages.error(request, 'You need to login to view this video.')
-        return redirect('login')
-    elif video.visibility == 'followers' and video.user != request.user and not video.user.followers.filter(id=request.user.id).exists():
+        return redirect('users:login')
+    elif video.visibility == 'followers' and video.user_id != request.user.pk and not follows(request.user.pk, video.user_id):
         messages.error(request, 'This video is only available to followers.')
-        return redirect('home')
+        return redirect('core:home')
 
     # Record view (if the user is authenticated, store their view, otherwise, leave it anonymous)
     viewer = request.user if request.user.is_authenticated else None
-    View.objects.create(user=viewer, video=video)
+    enqueue_view(video, viewer, viewer_key(request))
 
-    # Get comments, sorting by most recent first
-    comments = video.comments.filter(parent=None).order_by('-created_at')
+    # A page of top-level comments, newest first, with the start of each thread
+    comments = comment_page(video, request.GET.get('cursor'))
 
     # Check if the user liked the video
     user_like = None
@@ -79,15 +192,24 @@ def watch_video(request, video_id):
         user_like = video.likes.filter(user=request.user).first()
 
     # Get related videos (most recent from the same user, excluding the current video)
-    related_videos = video.user.videos.exclude(id=video.id).order_by('-created_at')[:5]
+    related_videos = list(
+        video.user.videos.visible_to(request.user).exclude(id=video.id).with_card_data().order_by('-created_at')[:5]
+    )
+
+    # Get recommended videos: precomputed nearest neighbors, best match first
+    recommended_videos = list(
+        Video.objects.visible_to(request.user).filter(neighbor_of__video=video)
+        .with_card_data()
+        .order_by('-neighbor_of__score')[:5]
+    )
 
-    # Get recommended videos (public, excluding current video)
-    recommended_videos = Video.objects.filter(visibility='public').exclude(id=video.id).exclude(user=video.user).order_by('-created_at')[:5]
+    # Fall back to the latest visible videos when the neighbor list is short
+    if len(recommended_videos) < 5:
+        exclude_ids = [video.id] + [recommended.id for recommended in recommended_videos]
+        additional_videos = Video.objects.visible_to(request.user).exclude(id__in=exclude_ids).with_card_data().order_by('-created_at')[:5 - len(recommended_videos)]
+        recommended_videos += list(additional_videos)
 
-    # If not enough recommended videos, include more from the same user
-    if len(recommended_videos) < 3:
-        additional_videos = Video.objects.filter(visibility='public').exclude(id=video.id).order_by('-created_at')[:5 - len(recommended_videos)]
-        recommended_videos = list(recommended_videos) + list(additional_videos)
+    prefetch_urls([video, *related_videos, *recommended_videos], 'thumbnail', 'video_file', 'user.profile_pic')
 
     context = {
         'video': video,
@@ -99,6 +221,89 @@ def watch_video(request, video_id):
 
     return render(request, 'videos/watch.html', context)
 
+def can_watch(video, user):
+    """Whether ``user`` may play ``video`` under its visibility setting."""
+    if video.visibility == 'public' or video.user_id == user.pk:
+        return True
+    if video.visibility == 'followers':
+        return follows(user.pk, video.user_id)
+    return False
+
+def stream_video(request, video_id):
+    """
+    Serve the original file with HTTP Range support from the local blob
+    cache, so seeking players re-read hot videos from disk rather than
+    from storage. Views are recorded by the watch page, not here.
+    """
+    video = get_object_or_404(Video, id=video_id)
+    if not can_watch(video, request.user):
+        raise Http404
+
+    size, handle = blob_cache.open(video.video_file.storage, video.video_file.name)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        if handle is not None:
+            handle.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    if handle is not None:
+        content = read_file(handle, start, length)
+    else:
+        content = read_storage(video.video_file.storage, video.video_file.name, start, length)
+    response = StreamingHttpResponse(content, status=206 if byte_range else 200, content_type=video.video_mime_type)
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    # Private videos must not land in shared caches
+    response['Cache-Control'] = 'public, max-age=86400' if video.visibility == 'public' else 'private, max-age=3600'
+    return response
+
+def hls_playlist(request, video_id, filename):
+    """
+    Serve one of the video's stored HLS playlists with every entry turned
+    into a signed URL: with SAS-protected storage the relative segment paths
+    inside the stored playlists would not resolve. Playlists never change
+    once written, so their text is cached.
+    """
+    video = get_object_or_404(Video, id=video_id)
+    playlists = {'master.m3u8', *(rendition['playlist'] for rendition in video.renditions)}
+    if not video.hls_playlist or filename not in playlists or not can_watch(video, request.user):
+        raise Http404
+
+    storage = video.video_file.storage
+    directory = os.path.dirname(video.hls_playlist)
+
+    def read():
+        with storage.open(f'{directory}/{filename}', 'rb') as playlist:
+            return playlist.read().decode()
+
+    lines = cache.get_or_set(f'videos:hls:{directory}/{filename}', read, 24 * 60 * 60).splitlines()
+    segments = [line for line in lines if line and not line.startswith('#') and not line.endswith('.m3u8')]
+    urls = storage.urls([f'{directory}/{segment}' for segment in segments])
+    for index, line in enumerate(lines):
+        if not line or line.startswith('#'):
+            continue
+        if line.endswith('.m3u8'):
+            lines[index] = reverse('videos:hls_playlist', args=[video.pk, line])
+        else:
+            lines[index] = urls[f'{directory}/{line}']
+
+    response = HttpResponse('\n'.join(lines) + '\n', content_type='application/vnd.apple.mpegurl')
+    # Well inside the signatures' remaining lifetime
+    response['Cache-Control'] = 'private, max-age=60'
+    return response
+
+@staff_member_required
+def blob_cache_stats(request):
+    """Hit/miss counters of this worker process's blob cache and its disk usage"""
+    return JsonResponse(blob_cache.stats())
+
 @login_required
 def edit_video(request, video_id):
     """
@@ -138,9 +343,10 @@ def delete_video(request, video_id):
     video = get_object_or_404(Video, id=video_id, user=request.user)
     if request.method == 'POST':
         try:
-            video.delete()
+            # Hidden now; the videos.reap job removes its rows and files
+            soft_delete(Video.objects.filter(pk=video.pk))
             messages.success(request, 'Video deleted successfully!')
-            return redirect('profile', username=request.user.username)
+            return redirect('users:profile', username=request.user.username)
         except Exception as e:
             messages.error(request, f"An error occurred while deleting the video: {str(e)}")
             return redirect('videos:watch', video_id=video.id)
@@ -149,46 +355,87 @@ def delete_video(request, video_id):
 
 def search(request):
     """
-    Search for videos based on query (title, description, tags, or user).
+    Full-text search over videos (title, tags, creator and description),
+    ranked by relevance and paginated.
     """
-    query = request.GET.get('q', '')
-    videos = Video.objects.filter(visibility='public')
+    query = request.GET.get('q', '').strip()
+    videos = Video.objects.visible_to(request.user).with_card_data(description=True)
 
     if query:
-        videos = videos.filter(
-            Q(title__icontains=query) | 
-            Q(description__icontains=query) |
-            Q(user__username__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct().order_by('-created_at')
-    
+        paginator = KeysetPaginator(videos.search(query), 12, ordering=('-rank', '-created_at', '-pk'))
+    else:
+        paginator = KeysetPaginator(videos, 12)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    prefetch_urls(page_obj, 'thumbnail', 'video_file', 'user.profile_pic')
+
     context = {
-        'videos': videos,
+        'videos': page_obj,
+        'page_obj': page_obj,
         'query': query,
     }
 
     return render(request, 'videos/search.html', context)
 
+def search_suggestions(request):
+    """
+    JSON typeahead for the navbar search box: matching tag names and creators.
+    """
+    response = JsonResponse(suggest(request.GET.get('q', '')))
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
 def videos_by_tag(request, tag_slug):
     """
     Display videos filtered by a specific tag.
     """
     tag = get_object_or_404(Tag, slug=tag_slug)
-    videos = tag.videos.filter(visibility='public').order_by('-created_at')
+    videos = tag.videos.visible_to(request.user).with_card_data(description=True)
+    page_obj = KeysetPaginator(videos, 12).get_page(request.GET.get('cursor'))
+    prefetch_urls(page_obj, 'thumbnail', 'video_file', 'user.profile_pic')
 
     context = {
         'tag': tag,
-        'videos': videos,
+        'videos': page_obj,
+        'page_obj': page_obj,
     }
 
     return render(request, 'videos/tag.html', context)
 
+@login_required
+def subscriptions(request):
+    """
+    The latest uploads of the creators the logged-in user follows.
+    """
+    page_obj = subscription_page(request.user, request.GET.get('cursor'))
+    prefetch_urls(page_obj, 'thumbnail', 'video_file', 'user.profile_pic')
+
+    context = {
+        'videos': page_obj,
+        'page_obj': page_obj,
+    }
+
+    return render(request, 'videos/subscriptions.html', context)
+
+def tag_list(request):
+    """
+    Tag cloud of the most used tags, sized by how many videos carry them.
+    """
+    tags = popular_tags()
+    if tags:
+        # Log-scaled weights 1-5, so a few huge tags do not flatten the rest
+        low, high = math.log(tags[-1]['video_count']), math.log(tags[0]['video_count'])
+        spread = (high - low) or 1
+        tags = [
+            {**tag, 'weight': 1 + round(4 * (math.log(tag['video_count']) - low) / spread)}
+            for tag in sorted(tags, key=lambda tag: tag['name'])
+        ]
+    return render(request, 'videos/tags.html', {'tags': tags})
+
 # Debug views
 def debug_storage(request):
     """Debug view to check storage configuration"""
-    from storages.backends.azure_storage import AzureStorage
     try:
-        storage = AzureStorage()
+        storage = get_media_storage()
         # Try to list files to check connection
         files = storage.listdir('')
         return render(request, 'videos/debug.html', {
@@ -208,8 +455,7 @@ def test_upload(request):
     """Test view to check if upload works"""
     if request.method == 'POST':
         # Simple file upload test
-        from storages.backends.azure_storage import AzureStorage
-        storage = AzureStorage()
+        storage = get_media_storage()
         
         test_file = request.FILES.get('test_file')
         if test_file: